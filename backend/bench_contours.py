@@ -0,0 +1,237 @@
+# bench_contours.py
+# Micro-benchmark for the sticker detection stage (Webcam.find_contours).
+#
+# Compares the original O(n^2 * 9) neighbor search with the grid-indexed
+# search in contours.py on recorded contour sets, and checks that both
+# return the same 9 stickers.
+#
+# Record contour sets from still frames (runs the same Canny/dilate
+# preprocessing as video.py):
+#     python -m backend.bench_contours --record sets.npz frame1.png frame2.png
+# Benchmark recorded sets:
+#     python -m backend.bench_contours sets.npz
+# Without arguments, synthetic sets (one cube face plus an increasing
+# amount of clutter) are generated instead.
+#
+# Detection recall of the downscaled edge pyramid (DETECTION_WIDTH)
+# against full-resolution detection, on rendered cube faces of varying
+# sticker size and gap:
+#     python -m backend.bench_contours --recall 320 640
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from backend.contours import REFERENCE_WIDTH, EdgePyramid, find_sticker_cluster, square_boxes
+
+
+def preprocess(frame):
+    """Full-resolution edge pipeline (Webcam with DETECTION_WIDTH=0)."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    blurred = cv2.blur(gray, (3, 3))
+    canny = cv2.Canny(blurred, 30, 60, 3)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 9))
+    return cv2.dilate(canny, kernel)
+
+
+def record(out_path, image_paths):
+    sets = {}
+    for n, path in enumerate(image_paths):
+        frame = cv2.imread(path)
+        if frame is None:
+            raise SystemExit(f"Could not read image: {path}")
+        contours, _ = cv2.findContours(preprocess(frame), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+        for i, c in enumerate(contours):
+            sets[f"set{n:04d}_{i:06d}"] = c
+        print(f"{path}: {len(contours)} contours")
+    np.savez_compressed(out_path, **sets)
+
+
+def load(path):
+    """Recorded .npz file -> list of contour sets (each a list of contours)."""
+    data = np.load(path)
+    sets = {}
+    for key in sorted(data.files):
+        name, _ = key.rsplit("_", 1)
+        sets.setdefault(name, []).append(data[key])
+    return list(sets.values())
+
+
+def synthetic_sets(clutter_counts=(0, 50, 100, 200, 400, 800), seed=0):
+    """
+    One 3x3 face plus n sticker-sized clutter squares per set, on a jittered
+    lattice (the canvas grows with n so the squares stay separate).
+    """
+    rng = np.random.default_rng(seed)
+    sets = []
+    for n in clutter_counts:
+        cols = max(8, int(np.ceil(np.sqrt(n + 16))))
+        frame = np.zeros((cols * 80 + 80, cols * 80 + 80), dtype=np.uint8)
+        cells = rng.permutation(cols * cols)
+        # Keep a 3x3 block of lattice cells free for the real face.
+        face = {(r, c) for r in range(3) for c in range(3)}
+        placed = 0
+        for cell in cells:
+            r, c = divmod(int(cell), cols)
+            if (r, c) in face or placed >= n:
+                continue
+            s = int(rng.integers(30, 56))
+            x, y = 80 + c * 80 + int(rng.integers(0, 15)), 80 + r * 80 + int(rng.integers(0, 15))
+            cv2.rectangle(frame, (x, y), (x + s, y + s), 255, 2)
+            placed += 1
+        for r, c in face:
+            x, y = 80 + c * 60, 80 + r * 60
+            cv2.rectangle(frame, (x, y), (x + 45, y + 45), 255, 2)
+        contours, _ = cv2.findContours(frame, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+        sets.append(list(contours))
+    return sets
+
+
+def find_contours_reference(contours):
+    """The original per-frame filter + nested-loop cluster search."""
+    final_contours = []
+    for contour in contours:
+        perimeter = cv2.arcLength(contour, True)
+        approx = cv2.approxPolyDP(contour, 0.1 * perimeter, True)
+        if len(approx) == 4:
+            area = cv2.contourArea(contour)
+            (x, y, w, h) = cv2.boundingRect(approx)
+            ratio = w / float(h)
+            if 0.8 <= ratio <= 1.2 and 30 <= w <= 60 and area / (w * h) > 0.4:
+                final_contours.append((x, y, w, h))
+
+    if len(final_contours) < 9:
+        return []
+
+    contour_neighbors = {}
+    for index, (x, y, w, h) in enumerate(final_contours):
+        contour_neighbors[index] = []
+        cx = x + w / 2
+        cy = y + h / 2
+        radius = 1.5
+        neighbor_positions = [
+            (cx + w * radius * dx, cy + h * radius * dy)
+            for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+        ]
+        for (x2, y2, w2, h2) in final_contours:
+            for (px, py) in neighbor_positions:
+                if x2 < px < x2 + w2 and y2 < py < y2 + h2:
+                    contour_neighbors[index].append((x2, y2, w2, h2))
+
+    for neighbors in contour_neighbors.values():
+        if len(neighbors) == 9:
+            return neighbors
+    return []
+
+
+def find_contours_grid(contours):
+    boxes = square_boxes(contours)
+    if len(boxes) < 9:
+        return []
+    return find_sticker_cluster(boxes)
+
+
+STICKER_COLORS = [(255, 255, 255), (0, 215, 255), (0, 160, 0), (200, 60, 0), (0, 0, 200), (0, 120, 255)]
+
+
+def render_face(width, height, sticker, gap, rng):
+    """
+    A camera-like frame with one 3x3 face: stickers of sticker px with gap
+    px of black plastic between them, at a random position on a noisy
+    background, lightly blurred.
+    """
+    frame = rng.integers(70, 130, (height, width, 3), dtype=np.uint8)
+    side = 3 * sticker + 4 * gap
+    x0 = int(rng.integers(0, width - side))
+    y0 = int(rng.integers(0, height - side))
+    frame[y0:y0 + side, x0:x0 + side] = 20
+    for r in range(3):
+        for c in range(3):
+            x = x0 + gap + c * (sticker + gap)
+            y = y0 + gap + r * (sticker + gap)
+            frame[y:y + sticker, x:x + sticker] = STICKER_COLORS[int(rng.integers(len(STICKER_COLORS)))]
+    return cv2.GaussianBlur(frame, (3, 3), 0)
+
+
+def detects_grid(frame, pyramid):
+    """True if the Webcam detection path (pyramid level + scaled limits) finds a 3x3 grid."""
+    width = frame.shape[1]
+    scale = pyramid.scale_for(width)
+    size_scale = width * scale / REFERENCE_WIDTH
+    contours, _ = cv2.findContours(pyramid.edges(frame, scale, size_scale), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = square_boxes(contours, size_scale)
+    return len(boxes) >= 9 and bool(find_sticker_cluster(boxes))
+
+
+def recall(widths, frame_sizes=((640, 480), (1280, 720)), gaps=(4, 8), trials=20, seed=0):
+    """
+    Fraction of rendered faces found at each detection width, per frame
+    size, sticker size and gap. Width 0 (full resolution) is the reference:
+    the totals count the faces it finds that each downscaled level misses.
+    """
+    widths = [0] + [w for w in widths if w]
+    missed = np.zeros(len(widths), dtype=int)
+    reference = 0
+    print(f"{'frame':>10} {'sticker':>8} {'gap':>4} " + " ".join(f"{'w=' + str(w):>7}" for w in widths))
+    for fw, fh in frame_sizes:
+        pyramids = [EdgePyramid(w) for w in widths]
+        k = fw / REFERENCE_WIDTH
+        for sticker in range(30, 60, 4):
+            for gap in gaps:
+                rng = np.random.default_rng(seed)
+                frames = [render_face(fw, fh, int(sticker * k), int(gap * k), rng) for _ in range(trials)]
+                found = np.array([[detects_grid(f, p) for f in frames] for p in pyramids])
+                missed += (found[0] & ~found).sum(axis=1)
+                reference += found[0].sum()
+                print(f"{fw}x{fh:<5} {int(sticker * k):>8} {int(gap * k):>4} "
+                      + " ".join(f"{row.mean():>7.0%}" for row in found))
+    for w, n in zip(widths[1:], missed[1:]):
+        print(f"w={w}: misses {n} of the {reference} faces found at full resolution")
+
+
+def timeit(fn, contours, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(contours)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sets", nargs="*", help="recorded .npz contour sets")
+    parser.add_argument("--record", metavar="OUT", help="record contours of the given images into OUT (.npz)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--recall", nargs="*", type=int, metavar="WIDTH",
+                        help="compare grid recall at these detection widths with full resolution")
+    args = parser.parse_args()
+
+    if args.recall is not None:
+        recall(args.recall or [320, REFERENCE_WIDTH])
+        return
+
+    if args.record:
+        record(args.record, args.sets)
+        return
+
+    sets = []
+    for path in args.sets:
+        sets.extend(load(path))
+    if not sets:
+        sets = synthetic_sets()
+
+    print(f"{'contours':>9} {'squares':>8} {'reference ms':>13} {'grid ms':>9} {'speedup':>8}  match")
+    for contours in sets:
+        expected = find_contours_reference(contours)
+        got = find_contours_grid(contours)
+        ref_ms = timeit(find_contours_reference, contours, args.repeat)
+        grid_ms = timeit(find_contours_grid, contours, args.repeat)
+        print(f"{len(contours):>9} {len(square_boxes(contours)):>8} {ref_ms:>13.2f} {grid_ms:>9.2f} "
+              f"{ref_ms / grid_ms:>7.1f}x  {'ok' if got == expected else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# bench_replay.py
+# Benchmark of the per-frame vision work (edge pyramid, find_contours,
+# update_preview_state / color classification) on a raw recording.
+#
+# Record a session with the camera, then replay it as often as needed:
+#     python -m backend.qbr --record session.npy
+#     python -m backend.bench_replay session.npy --repeat 5
+# The recording is memory mapped (recording.py), so replay has no decoding
+# or camera cost and every run sees exactly the same frames. Each run is a
+# fresh headless scan; the stage table is for the last run, and the
+# scanned state is checked to be identical across runs.
+
+import argparse
+import time
+
+from backend.constants import DETECTION_WIDTH
+from backend.contours import EdgePyramid
+from backend.profiler import FrameProfiler
+from backend.recording import ReplaySource
+from backend.video import FRAME_STAGES, Webcam
+
+
+def replay(path, detection_width=None):
+    """One headless scan of the recording: (result, frames processed, seconds, profiler)."""
+    source = ReplaySource(path)
+    webcam = Webcam()
+    # Every frame of the run in the rolling stats; the edge pyramid laps into the same profiler.
+    webcam.profiler = FrameProfiler(FRAME_STAGES, window=max(len(source.frames), 1), hud=False, enabled=True)
+    webcam.edge_pyramid = EdgePyramid(
+        DETECTION_WIDTH if detection_width is None else detection_width, webcam.profiler)
+
+    t0 = time.perf_counter()
+    result = webcam.run(source=source, headless=True)
+    return result, webcam.profiler.frames, time.perf_counter() - t0, webcam.profiler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording", help="recording made with qbr --record (.npy)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--detection-width", type=int, default=None,
+                        help="override DETECTION_WIDTH (0 = detect on the full frame)")
+    args = parser.parse_args()
+
+    results = set()
+    for run in range(args.repeat):
+        result, frames, seconds, profiler = replay(args.recording, args.detection_width)
+        results.add(result)
+        print(f"run {run + 1}: {frames} frames in {seconds * 1000:.1f} ms "
+              f"({frames / seconds:.1f} fps), result {result}")
+    print(profiler.summary())
+    if len(results) > 1:
+        raise SystemExit("Runs scanned different states")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# camera.py
+# Camera discovery for Webcam.open_camera, probed once and remembered.
+#
+# The first launch probes every candidate index (in parallel threads by
+# default), keeps the lowest index that delivers a frame and saves its
+# CameraProfile (index, resolution, fps, capture backend) as JSON. Later
+# launches open that device directly with the same backend; the full
+# probe only runs again if it no longer delivers frames.
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Iterable, Optional, Tuple
+
+import cv2
+
+from backend.helpers import write_json_atomic
+
+
+@dataclass
+class CameraProfile:
+    index: int
+    width: int
+    height: int
+    fps: float
+    backend: str  # cv2 backend name, e.g. "V4L2", "AVFOUNDATION", "MSMF"
+
+    @property
+    def api_preference(self) -> int:
+        return getattr(cv2, "CAP_" + self.backend, cv2.CAP_ANY)
+
+
+def open_device(index: int, width: int, height: int, api_preference: int = cv2.CAP_ANY):
+    """
+    Open a camera, request width x height and read one frame.
+    Returns (capture, profile), or None if it can't deliver frames.
+    """
+    cam = cv2.VideoCapture(index, api_preference)
+    if not cam.isOpened():
+        cam.release()
+        return None
+
+    cam.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cam.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    ret, frame = cam.read()
+    if not ret or frame is None:
+        cam.release()
+        return None
+
+    profile = CameraProfile(
+        index=index,
+        width=int(cam.get(cv2.CAP_PROP_FRAME_WIDTH)) or frame.shape[1],
+        height=int(cam.get(cv2.CAP_PROP_FRAME_HEIGHT)) or frame.shape[0],
+        fps=float(cam.get(cv2.CAP_PROP_FPS)),
+        backend=cam.getBackendName(),
+    )
+    return cam, profile
+
+
+class CameraRegistry:
+    """
+    Remembered camera profile, stored at path.
+
+    indices are the device indices probed on a cache miss; parallel probes
+    them concurrently (some capture backends serialise device opens, in
+    which case it is merely not faster).
+    """
+
+    def __init__(self, path: str, indices: Iterable[int] = range(5), width: int = 640, height: int = 480,
+                 parallel: bool = True):
+        self.path = path
+        self.indices = list(indices)
+        self.width = width
+        self.height = height
+        self.parallel = parallel
+
+    def load(self) -> Optional[CameraProfile]:
+        try:
+            with open(self.path) as f:
+                return CameraProfile(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def save(self, profile: CameraProfile):
+        write_json_atomic(self.path, asdict(profile))
+
+    def probe(self) -> Optional[Tuple[object, CameraProfile]]:
+        """Try every index; keep the lowest one that delivers a frame and release the others."""
+        if self.parallel and len(self.indices) > 1:
+            with ThreadPoolExecutor(max_workers=len(self.indices)) as pool:
+                results = list(pool.map(lambda i: open_device(i, self.width, self.height), self.indices))
+        else:
+            results = []
+            for i in self.indices:
+                results.append(open_device(i, self.width, self.height))
+                if results[-1] is not None:
+                    break
+
+        found = [r for r in results if r is not None]
+        for cam, _ in found[1:]:
+            cam.release()
+        return found[0] if found else None
+
+    def open(self, rescan: bool = False) -> Tuple[object, CameraProfile]:
+        """
+        Open the remembered camera, or probe for one (and remember it) if
+        there is none, it fails, or rescan is set. Raises RuntimeError if
+        no camera delivers frames.
+        """
+        cached = None if rescan else self.load()
+        if cached is not None:
+            opened = open_device(cached.index, cached.width, cached.height, cached.api_preference)
+            if opened is not None:
+                if opened[1] != cached:
+                    self.remember(opened[1])
+                return opened
+
+        opened = self.probe()
+        if opened is None:
+            raise RuntimeError("No valid camera found")
+        self.remember(opened[1])
+        return opened
+
+    def remember(self, profile: CameraProfile):
+        try:
+            self.save(profile)
+        except OSError as e:
+            print(f"Could not save camera profile to {self.path}: {e}")
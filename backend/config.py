@@ -1,17 +1,107 @@
 # backend/config.py
+#
+# Settings shared by the scanner UI and qbr, persisted as JSON.
+#
+# The file is read once, when the module is imported, and rewritten on
+# every change through a temp file + rename (helpers.write_json_atomic),
+# so a crash mid-write never leaves a truncated file behind.
+#
+# Calibrated palettes are kept as named profiles (e.g. one per camera or
+# lighting setup). Callbacks registered with watch_palette() receive the
+# active profile's palette at registration and whenever it changes; this
+# is how color_processing.color_detector follows calibrations.
+
+import json
+import threading
+
+from backend.constants import SETTINGS_FILE
+from backend.helpers import write_json_atomic
+
+DEFAULT_PALETTE_PROFILE = "default"
+
 
 class Config:
-    def __init__(self):
+    def __init__(self, path=None):
+        """path=None keeps the settings in memory only."""
+        self.path = path
         self._settings = {
-            "locale": "en"
+            "locale": "en",
+            "palette_profile": DEFAULT_PALETTE_PROFILE,
+            "palettes": {},
         }
+        self._palette_watchers = []
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable settings file {self.path}: {e}")
+            return
+        if isinstance(stored, dict):
+            self._settings.update(stored)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            try:
+                write_json_atomic(self.path, self._settings)
+            except OSError as e:
+                print(f"Could not save settings to {self.path}: {e}")
 
     def get_setting(self, key, default=None):
         return self._settings.get(key, default)
 
     def set_setting(self, key, value):
         self._settings[key] = value
+        self.save()
+
+    # ---------------- Palette profiles ----------------
+    @property
+    def palette_profile(self):
+        return self._settings["palette_profile"]
+
+    def palette_profiles(self):
+        return sorted(self._settings["palettes"])
+
+    def get_palette(self, profile=None):
+        """Calibrated {color: (b, g, r)} of a profile (default: the active one), or None."""
+        stored = self._settings["palettes"].get(profile or self.palette_profile)
+        if stored is None:
+            return None
+        return {name: tuple(int(c) for c in bgr) for name, bgr in stored.items()}
+
+    def save_palette(self, palette, profile=None):
+        """Store a calibrated palette under profile (default: the active one)."""
+        profile = profile or self.palette_profile
+        self._settings["palettes"][profile] = {name: [int(c) for c in bgr] for name, bgr in palette.items()}
+        self.save()
+        if profile == self.palette_profile:
+            self._notify_palette()
+
+    def use_palette_profile(self, profile):
+        """Switch the active profile (it may not have a palette yet)."""
+        if profile == self.palette_profile:
+            return
+        self.set_setting("palette_profile", profile)
+        self._notify_palette()
+
+    def watch_palette(self, callback):
+        """Call callback(palette or None) now and whenever the active palette changes."""
+        self._palette_watchers.append(callback)
+        callback(self.get_palette())
+
+    def _notify_palette(self):
+        palette = self.get_palette()
+        for callback in self._palette_watchers:
+            callback(palette)
 
 
-# global config object (as expected by QBR)
-config = Config()
\ No newline at end of file
+# global config object (as expected by QBR), loaded at import
+config = Config(SETTINGS_FILE)
@@ -38,6 +38,7 @@ STICKER_CONTOUR_COLOR = (0, 255, 0)  # green
 
 CALIBRATE_MODE_KEY = ord('c')     # press 'c' to calibrate
 SWITCH_LANGUAGE_KEY = ord('l')    # press 'l' to switch language
+PROFILER_KEY = ord('p')           # press 'p' to toggle the frame profiler
 EXIT_KEY = ord('q')
 
 
@@ -58,4 +59,106 @@ STICKER_AREA_OFFSET = 20
 
 MINI_STICKER_AREA_TILE_SIZE = 18
 MINI_STICKER_AREA_TILE_GAP = 4
-MINI_STICKER_AREA_OFFSET = 10
\ No newline at end of file
+MINI_STICKER_AREA_OFFSET = 10
+
+# ===============================
+# Sticker detection (video.py)
+# ===============================
+
+# Once a 3x3 grid is found, only search a window around it in later frames
+ROI_TRACKING_ENABLED = os.environ.get("ROI_TRACKING_ENABLED", "1") != "0"
+# Window padding around the last grid, in sticker widths
+ROI_TRACKING_MARGIN = float(os.environ.get("ROI_TRACKING_MARGIN", "1.0"))
+# Width of the downscaled level edges/contours are detected on (0 = full resolution).
+# Frames up to this wide are searched as-is; below the 640 px the sticker
+# limits were tuned for, grids with thin gaps are missed (see
+# bench_contours.py --recall).
+DETECTION_WIDTH = int(os.environ.get("DETECTION_WIDTH", "640"))
+
+# ===============================
+# Snapshot acceptance (video.py)
+# ===============================
+
+# A sticker counts as stable with at least SNAPSHOT_MIN_VOTES votes, at
+# least SNAPSHOT_MIN_STABILITY of them for the winning color, and a mean
+# classification confidence of SNAPSHOT_MIN_CONFIDENCE (0 = halfway
+# between two palette colors, 1 = exactly on one).
+SNAPSHOT_MIN_VOTES = int(os.environ.get("SNAPSHOT_MIN_VOTES", "4"))
+SNAPSHOT_MIN_STABILITY = float(os.environ.get("SNAPSHOT_MIN_STABILITY", "0.75"))
+SNAPSHOT_MIN_CONFIDENCE = float(os.environ.get("SNAPSHOT_MIN_CONFIDENCE", "0.15"))
+# The space key accepts a face with this many unstable stickers (glare)
+SNAPSHOT_MAX_UNSTABLE = int(os.environ.get("SNAPSHOT_MAX_UNSTABLE", "1"))
+# Headless scans snapshot on their own once all nine are stable with this many votes
+AUTO_SNAPSHOT_MIN_VOTES = int(os.environ.get("AUTO_SNAPSHOT_MIN_VOTES", "8"))
+
+# ===============================
+# Capture pipeline (pipeline.py)
+# ===============================
+
+# Run capture / processing / display on separate threads (qbr --pipelined)
+PIPELINE_ENABLED = os.environ.get("PIPELINE_ENABLED", "0") != "0"
+# Bounded queues between the stages; the oldest frame is dropped when full
+PIPELINE_CAPTURE_QUEUE_SIZE = int(os.environ.get("PIPELINE_CAPTURE_QUEUE_SIZE", "1"))
+PIPELINE_DISPLAY_QUEUE_SIZE = int(os.environ.get("PIPELINE_DISPLAY_QUEUE_SIZE", "2"))
+
+# ===============================
+# Frame profiler (profiler.py)
+# ===============================
+
+# Time every stage of every frame from the start (toggle at runtime with 'p')
+PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED", "0") != "0"
+# Append per-frame timings to this file (.csv or .jsonl); empty = no dump
+PROFILER_OUTPUT = os.environ.get("PROFILER_OUTPUT", "")
+# Frames the rolling p50/p95/max are computed over
+PROFILER_WINDOW = int(os.environ.get("PROFILER_WINDOW", "300"))
+# Draw fps / stage latencies over the camera image while profiling
+PROFILER_HUD = os.environ.get("PROFILER_HUD", "1") != "0"
+
+# ===============================
+# Frame recording (recording.py)
+# ===============================
+
+# Frames preallocated for qbr --record (640x480 frames take ~0.9 MB each)
+RECORD_MAX_FRAMES = int(os.environ.get("RECORD_MAX_FRAMES", "900"))
+# Rewrite the index every N recorded frames, so a crashed session can still be replayed
+RECORD_INDEX_FLUSH_FRAMES = int(os.environ.get("RECORD_INDEX_FLUSH_FRAMES", "30"))
+
+# ===============================
+# Persistent settings (config.py)
+# ===============================
+
+# Per-user state (settings, calibrated palettes, camera profile) lives here
+CONFIG_DIR = os.environ.get("QBR_CONFIG_DIR", str(Path.home() / ".config" / "qbr"))
+# Settings and named palette profiles; empty = keep settings in memory only
+SETTINGS_FILE = os.environ.get("SETTINGS_FILE", os.path.join(CONFIG_DIR, "settings.json"))
+
+# ===============================
+# Camera (camera.py)
+# ===============================
+
+# Remembered camera: index, resolution, fps and capture backend
+CAMERA_PROFILE_FILE = os.environ.get("CAMERA_PROFILE_FILE", os.path.join(CONFIG_DIR, "camera.json"))
+# Device indices tried when there is no working remembered camera
+CAMERA_PROBE_INDICES = range(int(os.environ.get("CAMERA_PROBE_COUNT", "5")))
+# Probe the indices concurrently
+CAMERA_PROBE_PARALLEL = os.environ.get("CAMERA_PROBE_PARALLEL", "1") != "0"
+CAMERA_WIDTH = int(os.environ.get("CAMERA_WIDTH", "640"))
+CAMERA_HEIGHT = int(os.environ.get("CAMERA_HEIGHT", "480"))
+
+# ===============================
+# Solver cache (/solve endpoint)
+# ===============================
+
+SOLVE_CACHE_ENABLED = os.environ.get("SOLVE_CACHE_ENABLED", "1") != "0"
+SOLVE_CACHE_MAX_SIZE = int(os.environ.get("SOLVE_CACHE_MAX_SIZE", "4096"))
+SOLVE_CACHE_TTL_SECONDS = float(os.environ.get("SOLVE_CACHE_TTL_SECONDS", "3600"))
+
+# ===============================
+# Solver process pool (/solve/batch)
+# ===============================
+
+SOLVE_POOL_WORKERS = int(os.environ.get("SOLVE_POOL_WORKERS", "0")) or None  # None = os.cpu_count()
+SOLVE_BATCH_MAX_ITEMS = int(os.environ.get("SOLVE_BATCH_MAX_ITEMS", "50000"))
+SOLVE_POOL_MAX_PENDING = int(os.environ.get("SOLVE_POOL_MAX_PENDING", "256"))  # single /solve calls; batches are exempt
+SOLVE_TIMEOUT_MS = int(os.environ.get("SOLVE_TIMEOUT_MS", "10000"))
+SOLVE_TIMEOUT_MAX_MS = int(os.environ.get("SOLVE_TIMEOUT_MAX_MS", "60000"))  # largest timeout_ms a /solve call may ask for
@@ -0,0 +1,311 @@
+# contours.py
+# Sticker detection helpers used by video.Webcam.find_contours.
+#
+# Candidate squares are kept as an (N, 4) int array of bounding boxes
+# (x, y, w, h). The 3x3 cluster search probes 9 points around every box;
+# instead of testing each probe against every box (O(n^2 * 9)), boxes are
+# bucketed into a uniform grid and each probe only looks at the boxes
+# registered in its own cell, so the cost grows linearly with n.
+#
+# Once a grid is found, tracking_window() gives the region later frames
+# are searched in (see Webcam.detect_contours).
+#
+# Detection runs on a downscaled copy of the frame (EdgePyramid). Pixel
+# limits below are for a REFERENCE_WIDTH-wide image and are scaled to the
+# width actually being searched.
+
+import cv2
+import numpy as np
+
+# Image width the pixel limits below were tuned for
+REFERENCE_WIDTH = 640
+DILATE_KERNEL_SIZE = 9
+
+# Square filter (same limits as the original per-contour loop)
+MIN_STICKER_SIZE = 30
+MAX_STICKER_SIZE = 60
+MIN_ASPECT_RATIO = 0.8
+MAX_ASPECT_RATIO = 1.2
+MIN_FILL_RATIO = 0.4
+
+# Probe offsets around a box center, in units of the box size
+NEIGHBOR_RADIUS = 1.5
+
+# Below this many boxes a dense (9N x N) containment test is cheaper than
+# building the grid index
+DENSE_SEARCH_MAX_BOXES = 64
+_PROBE_OFFSETS = np.array(
+    [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)], dtype=np.float64
+) * NEIGHBOR_RADIUS  # (9, 2), row-major like the sticker grid
+
+
+def square_boxes(contours, size_scale: float = 1.0) -> np.ndarray:
+    """
+    Bounding boxes (x, y, w, h) of the square-ish, sticker-sized contours.
+
+    A box is kept when the contour simplifies to 4 vertices, its
+    bounding box has an aspect ratio in [0.8, 1.2], a width in [30, 60]
+    (times size_scale) and the contour fills more than 40% of it.
+
+    The approximated polygon lies inside the contour's own bounding box,
+    so contours whose raw box is already too small are dropped in one
+    vectorized step before any per-contour approxPolyDP call.
+    """
+    if len(contours) == 0:
+        return np.empty((0, 4), dtype=np.int32)
+
+    min_size = MIN_STICKER_SIZE * size_scale
+    max_size = MAX_STICKER_SIZE * size_scale
+
+    raw = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int32)
+    min_h = min_size / MAX_ASPECT_RATIO
+    keep = np.flatnonzero((raw[:, 2] >= min_size) & (raw[:, 3] >= min_h))
+
+    boxes = []
+    for i in keep:
+        contour = contours[i]
+        perimeter = cv2.arcLength(contour, True)
+        approx = cv2.approxPolyDP(contour, 0.1 * perimeter, True)
+        if len(approx) != 4:
+            continue
+        boxes.append(cv2.boundingRect(approx) + (cv2.contourArea(contour),))
+
+    if not boxes:
+        return np.empty((0, 4), dtype=np.int32)
+
+    cand = np.array(boxes, dtype=np.float64)  # (M, 5): x, y, w, h, area
+    w, h, area = cand[:, 2], cand[:, 3], cand[:, 4]
+    ratio = w / h
+    ok = (
+        (MIN_ASPECT_RATIO <= ratio) & (ratio <= MAX_ASPECT_RATIO)
+        & (min_size <= w) & (w <= max_size)
+        & (area / (w * h) > MIN_FILL_RATIO)
+    )
+    return cand[ok, :4].astype(np.int32)
+
+
+def probe_points(boxes: np.ndarray) -> np.ndarray:
+    """The 9 neighbor probe points of every box, as an (N, 9, 2) float array."""
+    x, y, w, h = (boxes[:, i].astype(np.float64) for i in range(4))
+    cx = x + w / 2
+    cy = y + h / 2
+    px = cx[:, None] + w[:, None] * _PROBE_OFFSETS[:, 0]
+    py = cy[:, None] + h[:, None] * _PROBE_OFFSETS[:, 1]
+    return np.stack([px, py], axis=-1)
+
+
+class BoxGrid:
+    """
+    Uniform-grid spatial index over (x, y, w, h) boxes.
+
+    The cell size is at least the largest box dimension, so every box
+    overlaps at most 2x2 cells and is registered in each of them.
+    """
+
+    def __init__(self, boxes: np.ndarray):
+        self.boxes = boxes
+        self.cell = float(max(1, boxes[:, 2:4].max())) if len(boxes) else 1.0
+
+        x0 = np.floor(boxes[:, 0] / self.cell).astype(np.int64)
+        y0 = np.floor(boxes[:, 1] / self.cell).astype(np.int64)
+        x1 = np.floor((boxes[:, 0] + boxes[:, 2]) / self.cell).astype(np.int64)
+        y1 = np.floor((boxes[:, 1] + boxes[:, 3]) / self.cell).astype(np.int64)
+
+        box_ids, keys = [], []
+        for dx in (0, 1):
+            for dy in (0, 1):
+                valid = (x0 + dx <= x1) & (y0 + dy <= y1)
+                box_ids.append(np.flatnonzero(valid))
+                keys.append(self._key(x0[valid] + dx, y0[valid] + dy))
+
+        box_ids = np.concatenate(box_ids)
+        keys = np.concatenate(keys)
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._box_ids = box_ids[order]
+
+    @staticmethod
+    def _key(cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+        # Cells are small integers (frame size / cell size); pack them into one int64.
+        return (cx << 32) ^ (cy & 0xFFFFFFFF)
+
+    def containing(self, points: np.ndarray):
+        """
+        All (point, box) pairs where the box strictly contains the point.
+        points is (P, 2); returns two index arrays (point_idx, box_idx),
+        ordered by point.
+        """
+        cx = np.floor(points[:, 0] / self.cell).astype(np.int64)
+        cy = np.floor(points[:, 1] / self.cell).astype(np.int64)
+        key = self._key(cx, cy)
+
+        lo = np.searchsorted(self._keys, key, side="left")
+        hi = np.searchsorted(self._keys, key, side="right")
+        counts = hi - lo
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+        point_idx = np.repeat(np.arange(len(points)), counts)
+        starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        box_idx = self._box_ids[starts + np.arange(total)]
+
+        b = self.boxes[box_idx]
+        p = points[point_idx]
+        inside = (
+            (b[:, 0] < p[:, 0]) & (p[:, 0] < b[:, 0] + b[:, 2])
+            & (b[:, 1] < p[:, 1]) & (p[:, 1] < b[:, 1] + b[:, 3])
+        )
+        return point_idx[inside], box_idx[inside]
+
+
+def _containing_dense(boxes: np.ndarray, points: np.ndarray):
+    """Same result as BoxGrid.containing, by testing every point against every box."""
+    x, y = points[:, 0:1], points[:, 1:2]
+    inside = (
+        (boxes[:, 0] < x) & (x < boxes[:, 0] + boxes[:, 2])
+        & (boxes[:, 1] < y) & (y < boxes[:, 1] + boxes[:, 3])
+    )
+    return np.nonzero(inside)
+
+
+def find_sticker_cluster(boxes: np.ndarray):
+    """
+    First box (in input order) whose 9 probe points hit exactly 9
+    (box, probe) pairs, returned as its list of neighbor boxes, or [].
+
+    Neighbors are listed box-major then probe-major, and a box that
+    contains several probes is listed once per probe, exactly like the
+    original nested loop, so the downstream 3x3 ordering is unchanged.
+    """
+    n = len(boxes)
+    if n < 9:
+        return []
+
+    points = probe_points(boxes).reshape(-1, 2)
+    if n <= DENSE_SEARCH_MAX_BOXES:
+        point_idx, box_idx = _containing_dense(boxes, points)
+    else:
+        point_idx, box_idx = BoxGrid(boxes).containing(points)
+    owner = point_idx // 9
+
+    hits = np.bincount(owner, minlength=n)
+    winners = np.flatnonzero(hits == 9)
+    if winners.size == 0:
+        return []
+
+    mine = owner == winners[0]
+    probe = point_idx[mine] % 9
+    found = box_idx[mine]
+    order = np.lexsort((probe, found))
+    return [tuple(int(v) for v in boxes[j]) for j in found[order]]
+
+
+def tracking_window(grid, margin: float, width: int, height: int, align: int = 1):
+    """
+    Search window (x0, y0, x1, y1) around a locked 3x3 grid of boxes,
+    expanded by margin sticker widths on every side and clipped to the frame.
+
+    The window is snapped outwards to multiples of align, so that when
+    detection runs on a level downscaled by an integer factor, the
+    downscaled window lines up with the pixels of the downscaled frame.
+    """
+    boxes = np.asarray(grid)
+    pad = int(margin * boxes[:, 2:4].mean())
+    x0 = max(0, int(boxes[:, 0].min()) - pad) // align * align
+    y0 = max(0, int(boxes[:, 1].min()) - pad) // align * align
+    x1 = -(-(int((boxes[:, 0] + boxes[:, 2]).max()) + pad) // align) * align
+    y1 = -(-(int((boxes[:, 1] + boxes[:, 3]).max()) + pad) // align) * align
+    return x0, y0, min(width, x1), min(height, y1)
+
+
+def scale_boxes(grid, scale: float, dx: int = 0, dy: int = 0):
+    """
+    Map (x, y, w, h) boxes found on a level downscaled by scale back to
+    full resolution, then translate them by (dx, dy) (window origin).
+    """
+    if scale == 1.0:
+        return [(x + dx, y + dy, w, h) for (x, y, w, h) in grid]
+    return [
+        (int(round(x / scale)) + dx, int(round(y / scale)) + dy,
+         int(round(w / scale)), int(round(h / scale)))
+        for (x, y, w, h) in grid
+    ]
+
+
+class EdgePyramid:
+    """
+    Edge map used for sticker detection, computed on a downscaled level:
+    resize -> gray -> blur -> Canny -> dilate.
+
+    The level is detection_width pixels wide (frames that are already
+    narrower are used as-is, and detection_width=0 disables downscaling).
+    Intermediate buffers are allocated once for the largest input seen and
+    smaller inputs (tracking windows) write into views of them, so the
+    returned edge map is only valid until the next call. Dilate kernels
+    are scaled to the level and cached.
+
+    With a profiler (profiler.FrameProfiler), every step is lapped under
+    its own stage name while the profiler is enabled.
+    """
+
+    def __init__(self, detection_width: int = REFERENCE_WIDTH, profiler=None):
+        self.detection_width = detection_width
+        self.profiler = profiler
+        self._buffers = None  # (level BGR, gray, blurred, canny, dilated)
+        self._kernels = {}
+
+    def scale_for(self, frame_width: int) -> float:
+        """Downscale factor from a full frame of frame_width to the detection level."""
+        if not self.detection_width or frame_width <= self.detection_width:
+            return 1.0
+        return self.detection_width / frame_width
+
+    def kernel(self, size_scale: float) -> np.ndarray:
+        size = max(3, int(round(DILATE_KERNEL_SIZE * size_scale)) | 1)
+        kernel = self._kernels.get(size)
+        if kernel is None:
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (size, size))
+            self._kernels[size] = kernel
+        return kernel
+
+    def _views(self, h: int, w: int):
+        bufs = self._buffers
+        if bufs is None or bufs[0].shape[0] < h or bufs[0].shape[1] < w:
+            bufs = (np.empty((h, w, 3), dtype=np.uint8),) + tuple(
+                np.empty((h, w), dtype=np.uint8) for _ in range(4)
+            )
+            self._buffers = bufs
+        return [b[:h, :w] for b in bufs]
+
+    def edges(self, image: np.ndarray, scale: float, size_scale: float) -> np.ndarray:
+        """
+        Dilated edge map of a BGR image (full frame or a window of it),
+        downscaled by scale. size_scale is the sticker size on the level
+        relative to REFERENCE_WIDTH (it sets the dilate kernel).
+        """
+        h = max(1, int(round(image.shape[0] * scale)))
+        w = max(1, int(round(image.shape[1] * scale)))
+        level, gray, blurred, canny, dilated = self._views(h, w)
+        prof = self.profiler
+        timed = prof is not None and prof.enabled
+
+        if scale != 1.0:
+            cv2.resize(image, (w, h), dst=level, interpolation=cv2.INTER_AREA)
+            if timed:
+                prof.lap("resize")
+        else:
+            level = image
+        cv2.cvtColor(level, cv2.COLOR_BGR2GRAY, dst=gray)
+        if timed:
+            prof.lap("cvtColor")
+        cv2.blur(gray, (3, 3), dst=blurred)
+        if timed:
+            prof.lap("blur")
+        cv2.Canny(blurred, 30, 60, edges=canny, apertureSize=3)
+        if timed:
+            prof.lap("Canny")
+        cv2.dilate(canny, self.kernel(size_scale), dst=dilated)
+        if timed:
+            prof.lap("dilate")
+        return dilated
@@ -0,0 +1,278 @@
+# cube_state.py
+# Compact cube state shared by fix_cube, qbr and reorder.
+#
+# A CubeState holds the 54 facelet letters in URFDLB order as bytes.
+# Every transformation (face turn, in-plane face rotation, whole-cube
+# rotation) is a precomputed index permutation applied in a single gather:
+#     new[i] = old[perm[i]]
+#
+# The tables are derived once, at import, from the 3D position and normal
+# of every facelet, using the Kociemba facelet layout (U1..U9, R1..R9, ...).
+
+from __future__ import annotations
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+FACES = "URFDLB"
+BASE = {"U": 0, "R": 9, "F": 18, "D": 27, "L": 36, "B": 45}
+
+# In-plane clockwise quarter turn of a 3x3 face (row-major): new[i] = old[ROT_CW[i]]
+FACE_ROT_CW = (6, 3, 0, 7, 4, 1, 8, 5, 2)
+
+
+class Permutation:
+    """Index permutation over the 54 facelets: apply(data)[i] == data[indices[i]]."""
+
+    __slots__ = ("indices", "_gather")
+
+    def __init__(self, indices: Iterable[int]):
+        self.indices = tuple(indices)
+        self._gather = itemgetter(*self.indices)
+
+    def apply(self, data: bytes) -> bytes:
+        return bytes(self._gather(data))
+
+    def then(self, other: Permutation) -> Permutation:
+        """Permutation equivalent to applying self first, then other."""
+        return Permutation(self.indices[j] for j in other.indices)
+
+    def inverse(self) -> Permutation:
+        inv = [0] * len(self.indices)
+        for i, j in enumerate(self.indices):
+            inv[j] = i
+        return Permutation(inv)
+
+    def __eq__(self, other):
+        return isinstance(other, Permutation) and self.indices == other.indices
+
+    def __hash__(self):
+        return hash(self.indices)
+
+    def __repr__(self):
+        return f"Permutation({self.indices})"
+
+
+IDENTITY = Permutation(range(54))
+
+
+# ----------------------------
+# Table construction
+# ----------------------------
+_NORMALS = {
+    "U": (0, 1, 0), "R": (1, 0, 0), "F": (0, 0, 1),
+    "D": (0, -1, 0), "L": (-1, 0, 0), "B": (0, 0, -1),
+}
+
+
+def _facelet_position(face: str, row: int, col: int) -> Tuple[int, int, int]:
+    """Sticker center in cube coordinates (x -> R, y -> U, z -> F), each in -1..1."""
+    if face == "U":
+        return (col - 1, 1, row - 1)
+    if face == "R":
+        return (1, 1 - row, 1 - col)
+    if face == "F":
+        return (col - 1, 1 - row, 1)
+    if face == "D":
+        return (col - 1, -1, 1 - row)
+    if face == "L":
+        return (-1, 1 - row, col - 1)
+    return (1 - col, 1 - row, -1)  # B
+
+
+_GEOMETRY = [
+    (_facelet_position(face, i // 3, i % 3), _NORMALS[face])
+    for face in FACES
+    for i in range(9)
+]
+_INDEX_OF = {geo: i for i, geo in enumerate(_GEOMETRY)}
+
+
+def _cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+
+def _quarter_turn_cw(axis, v):
+    """Rotate v by 90 degrees clockwise as seen looking at the cube from the tip of axis."""
+    c = _cross(axis, v)
+    d = axis[0] * v[0] + axis[1] * v[1] + axis[2] * v[2]
+    return (-c[0] + axis[0] * d, -c[1] + axis[1] * d, -c[2] + axis[2] * d)
+
+
+def _turn(axis, layer_only: bool) -> Permutation:
+    """Clockwise quarter turn about axis, of the outer layer only or of the whole cube."""
+    perm = list(range(54))
+    for src, (pos, normal) in enumerate(_GEOMETRY):
+        if layer_only and pos[0] * axis[0] + pos[1] * axis[1] + pos[2] * axis[2] != 1:
+            continue
+        dst = _INDEX_OF[(_quarter_turn_cw(axis, pos), _quarter_turn_cw(axis, normal))]
+        perm[dst] = src
+    return Permutation(perm)
+
+
+def _with_modifiers(base: Dict[str, Permutation]) -> Dict[str, Permutation]:
+    out = {}
+    for name, p in base.items():
+        p2 = p.then(p)
+        out[name] = p
+        out[name + "2"] = p2
+        out[name + "'"] = p2.then(p)
+    return out
+
+
+def permutation_closure(generators: Sequence[Permutation]) -> List[Permutation]:
+    """All permutations reachable from IDENTITY, in BFS order."""
+    seen = {IDENTITY}
+    order = [IDENTITY]
+    for p in order:
+        for g in generators:
+            q = p.then(g)
+            if q not in seen:
+                seen.add(q)
+                order.append(q)
+    return order
+
+
+def face_permutation(mapping: Dict[str, Tuple[str, int]]) -> Permutation:
+    """
+    Build a face-level permutation: mapping[target] = (source, k) puts the
+    source face, rotated k quarter turns clockwise in-plane, into the target
+    slot. Faces missing from mapping stay where they are.
+    """
+    perm = list(range(54))
+    for target, (source, k) in mapping.items():
+        block = list(range(9))
+        for _ in range(k % 4):
+            block = [block[j] for j in FACE_ROT_CW]
+        b_t, b_s = BASE[target], BASE[source]
+        for i in range(9):
+            perm[b_t + i] = b_s + block[i]
+    return Permutation(perm)
+
+
+# Face turns in standard notation: U, U2, U', R, ...
+MOVES = _with_modifiers({f: _turn(_NORMALS[f], layer_only=True) for f in FACES})
+
+# Whole-cube rotations: x follows R, y follows U, z follows F.
+ROTATIONS = _with_modifiers({
+    "x": _turn(_NORMALS["R"], layer_only=False),
+    "y": _turn(_NORMALS["U"], layer_only=False),
+    "z": _turn(_NORMALS["F"], layer_only=False),
+})
+
+# The 24 rigid orientations of the whole cube (ORIENTATIONS[0] is IDENTITY).
+ORIENTATIONS = permutation_closure([ROTATIONS["x"], ROTATIONS["y"]])
+
+# FACE_ROTATIONS[face][k]: rotate one face k quarter turns clockwise in-plane.
+FACE_ROTATIONS = {
+    f: [face_permutation({f: (f, k)}) for k in range(4)]
+    for f in FACES
+}
+
+# Absolute facelet indices of each face block after k in-plane quarter turns.
+_FACE_BLOCKS = {
+    f: [FACE_ROTATIONS[f][k].indices[BASE[f]:BASE[f] + 9] for k in range(4)]
+    for f in FACES
+}
+
+
+@lru_cache(maxsize=None)
+def face_rotations_permutation(rots: Tuple[int, int, int, int, int, int]) -> Permutation:
+    """Rotate each URFDLB face in-plane by rots[i] quarter turns, as one permutation."""
+    indices = ()
+    for f, k in zip(FACES, rots):
+        indices += _FACE_BLOCKS[f][k % 4]
+    return Permutation(indices)
+
+
+# ----------------------------
+# CubeState
+# ----------------------------
+class CubeState:
+    """Immutable 54-facelet cube in URFDLB order, stored as ASCII bytes."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, facelets: Union[str, bytes]):
+        if isinstance(facelets, str):
+            facelets = facelets.encode("ascii")
+        if len(facelets) != 54:
+            raise ValueError(f"Cube string must be 54 characters, got {len(facelets)}")
+        self._data = bytes(facelets)
+
+    @classmethod
+    def _wrap(cls, data: bytes) -> CubeState:
+        # Trusted constructor for results of a permutation (already 54 bytes).
+        state = object.__new__(cls)
+        state._data = data
+        return state
+
+    @classmethod
+    def solved(cls) -> CubeState:
+        return cls("".join(f * 9 for f in FACES))
+
+    @property
+    def data(self) -> bytes:
+        return self._data
+
+    def __str__(self):
+        return self._data.decode("ascii")
+
+    def __repr__(self):
+        return f"CubeState({str(self)!r})"
+
+    def __len__(self):
+        return 54
+
+    def __getitem__(self, i):
+        return chr(self._data[i])
+
+    def __eq__(self, other):
+        return isinstance(other, CubeState) and self._data == other._data
+
+    def __hash__(self):
+        return hash(self._data)
+
+    def face(self, face: str) -> str:
+        b = BASE[face]
+        return self._data[b:b + 9].decode("ascii")
+
+    def center(self, face: str) -> str:
+        return chr(self._data[BASE[face] + 4])
+
+    def count(self, letter: str) -> int:
+        return self._data.count(letter.encode("ascii"))
+
+    def permute(self, perm: Permutation) -> CubeState:
+        return CubeState._wrap(perm.apply(self._data))
+
+    def move(self, alg: str) -> CubeState:
+        """Apply face turns / rotations in standard notation, e.g. "R U R' U'"."""
+        data = self._data
+        for m in alg.split():
+            perm = MOVES.get(m) or ROTATIONS.get(m)
+            if perm is None:
+                raise ValueError(f"Unknown move: {m}")
+            data = perm.apply(data)
+        return CubeState._wrap(data)
+
+    def rotate_face(self, face: str, k: int) -> CubeState:
+        return self.permute(FACE_ROTATIONS[face][k % 4])
+
+    def rotate_faces(self, rots: Sequence[int]) -> CubeState:
+        return self.permute(face_rotations_permutation(tuple(rots)))
+
+    def orientations(self) -> List[CubeState]:
+        """The cube seen from all 24 whole-cube orientations (duplicates kept)."""
+        return [self.permute(p) for p in ORIENTATIONS]
+
+    def relabel(self, mapping: Dict[str, str]) -> CubeState:
+        """Replace every letter via mapping (all letters present must be mapped)."""
+        for ch in set(self._data.decode("ascii")):
+            if ch not in mapping:
+                raise KeyError(ch)
+        table = bytes.maketrans(
+            "".join(mapping.keys()).encode("ascii"),
+            "".join(mapping.values()).encode("ascii"),
+        )
+        return CubeState._wrap(self._data.translate(table))
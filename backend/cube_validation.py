@@ -9,6 +9,17 @@
 #   U1..U9, R1..R9, F1..F9, D1..D9, L1..L9, B1..B9
 #
 # That matches the Kociemba Python package.
+#
+# Every cubie is classified with one dict lookup: the ordered colour tuple
+# read at a corner/edge position maps straight to (piece, orientation).
+# validate_cube() computes permutation, twist, flip and parity in a single
+# pass and is shared by is_cube_solvable() and the fix_cube search.
+# validate_many() runs the same checks over an (N, 54) array of states.
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 # ----------------------------------------------------------------------
 # Helpers: mapping from facelet (U1, R3, etc.) to index in the 54-char string
@@ -122,6 +133,172 @@ def check_parity(corner_perm, edge_perm):
     return _permutation_parity(corner_perm) == _permutation_parity(edge_perm)
 
 
+# ----------------------------------------------------------------------
+# Lookup tables: ordered colours at a position -> (piece, orientation)
+# ----------------------------------------------------------------------
+# Corner orientation o means the piece's U/D colour sits on facelet o of
+# the position; the other two colours follow clockwise. Edge orientation 1
+# means the piece's colours are reversed. Anything not in these tables is
+# a physically impossible cubie (wrong colour set or mirrored corner).
+
+def _build_corner_lookup() -> Dict[Tuple[str, str, str], Tuple[int, int]]:
+    lookup = {}
+    for j, cc in enumerate(corner_colors):
+        for o in range(3):
+            cols = [None] * 3
+            for k in range(3):
+                cols[(o + k) % 3] = cc[k]
+            lookup[tuple(cols)] = (j, o)
+    return lookup
+
+
+def _build_edge_lookup() -> Dict[Tuple[str, str], Tuple[int, int]]:
+    lookup = {}
+    for j, (a, b) in enumerate(edge_colors):
+        lookup[(a, b)] = (j, 0)
+        lookup[(b, a)] = (j, 1)
+    return lookup
+
+
+CORNER_LOOKUP = _build_corner_lookup()
+EDGE_LOOKUP = _build_edge_lookup()
+
+
+# ----------------------------------------------------------------------
+# Structured result
+# ----------------------------------------------------------------------
+
+# Failure codes (ValidationResult.code), in the order checks are applied.
+OK = 0
+FAIL_LENGTH = 1
+FAIL_COUNTS = 2
+FAIL_CUBIE = 3       # impossible corner/edge colours
+FAIL_DUPLICATE = 4   # same cubie appears twice
+FAIL_TWIST = 5
+FAIL_FLIP = 6
+FAIL_PARITY = 7
+
+
+@dataclass
+class ValidationResult:
+    ok: bool
+    reason: str
+    bad_corners: List[Tuple[int, Tuple[str, str, str]]]
+    bad_edges: List[Tuple[int, Tuple[str, str]]]
+    counts: Optional[dict] = None
+    corner_twist_sum_mod3: Optional[int] = None
+    edge_flip_sum_mod2: Optional[int] = None
+    corner_parity: Optional[int] = None
+    edge_parity: Optional[int] = None
+    code: int = OK
+
+    def score(self) -> int:
+        # lower is better
+        return len(self.bad_corners) * 10 + len(self.bad_edges) * 10 + (0 if self.ok else 100)
+
+
+# ----------------------------------------------------------------------
+# Single-pass validator
+# ----------------------------------------------------------------------
+
+def validate_cube(cube_string: str) -> ValidationResult:
+    """
+    Classify every cubie via CORNER_LOOKUP / EDGE_LOOKUP and check
+    counts, impossible cubies, duplicates, twist, flip and parity.
+    Never raises; the first failing check is reported.
+    """
+    if len(cube_string) != 54:
+        return ValidationResult(False, "Length != 54", [], [], code=FAIL_LENGTH)
+
+    counts = {ch: cube_string.count(ch) for ch in "URFDLB"}
+    if any(n != 9 for n in counts.values()):
+        return ValidationResult(False, f"Bad counts: {counts}", [], [], counts=counts, code=FAIL_COUNTS)
+
+    cp, co, bad_corners = [], 0, []
+    for i, (a, b, c) in enumerate(corner_facelets):
+        cols = (cube_string[a], cube_string[b], cube_string[c])
+        hit = CORNER_LOOKUP.get(cols)
+        if hit is None:
+            bad_corners.append((i, cols))
+        else:
+            cp.append(hit[0])
+            co += hit[1]
+
+    ep, eo, bad_edges = [], 0, []
+    for i, (a, b) in enumerate(edge_facelets):
+        cols = (cube_string[a], cube_string[b])
+        hit = EDGE_LOOKUP.get(cols)
+        if hit is None:
+            bad_edges.append((i, cols))
+        else:
+            ep.append(hit[0])
+            eo += hit[1]
+
+    if bad_corners or bad_edges:
+        return ValidationResult(
+            False,
+            "Some corner/edge color SETS are impossible (at least 1 sticker is wrong).",
+            bad_corners,
+            bad_edges,
+            counts=counts,
+            code=FAIL_CUBIE,
+        )
+
+    if len(set(cp)) != 8:
+        return ValidationResult(False, "Duplicate corner cubie detected.", [], [], counts=counts, code=FAIL_DUPLICATE)
+    if len(set(ep)) != 12:
+        return ValidationResult(False, "Duplicate edge cubie detected.", [], [], counts=counts, code=FAIL_DUPLICATE)
+
+    twist = co % 3
+    flip = eo % 2
+    if twist != 0:
+        return ValidationResult(
+            False,
+            "Corner twist sum invalid (one corner is twisted in scan).",
+            [], [],
+            counts=counts,
+            corner_twist_sum_mod3=twist,
+            edge_flip_sum_mod2=flip,
+            code=FAIL_TWIST,
+        )
+    if flip != 0:
+        return ValidationResult(
+            False,
+            "Edge flip sum invalid (one edge is flipped in scan).",
+            [], [],
+            counts=counts,
+            corner_twist_sum_mod3=twist,
+            edge_flip_sum_mod2=flip,
+            code=FAIL_FLIP,
+        )
+
+    cpar = _permutation_parity(cp)
+    epar = _permutation_parity(ep)
+    if cpar != epar:
+        return ValidationResult(
+            False,
+            "Parity mismatch (two cubies swapped OR one sticker wrong).",
+            [], [],
+            counts=counts,
+            corner_twist_sum_mod3=twist,
+            edge_flip_sum_mod2=flip,
+            corner_parity=cpar,
+            edge_parity=epar,
+            code=FAIL_PARITY,
+        )
+
+    return ValidationResult(
+        True,
+        "OK",
+        [], [],
+        counts=counts,
+        corner_twist_sum_mod3=twist,
+        edge_flip_sum_mod2=flip,
+        corner_parity=cpar,
+        edge_parity=epar,
+    )
+
+
 # ----------------------------------------------------------------------
 # Extract corners / edges, permutations & orientations from cube_string
 # ----------------------------------------------------------------------
@@ -131,39 +308,17 @@ def extract_corners(cube_string):
     From a 54-character cube_string, compute:
       - cp: corner permutation (list of 8 ints, each in 0..7)
       - co: corner orientation (list of 8 ints, each in {0,1,2})
-
-    Algorithm mirrors Kociemba's FaceCube -> CubieCube conversion.
     """
-    cp = [None] * 8  # which cubie is in each corner position
-    co = [0] * 8     # orientation for each corner
-
-    for i in range(8):  # for each corner position
-        # find which of the 3 facelets is on U or D
-        ori = 0
-        for o in range(3):
-            c = cube_string[corner_facelets[i][o]]
-            if c == "U" or c == "D":
-                ori = o
-                break
-
-        # the other two colors (in order) relative to that orientation
-        c1 = cube_string[corner_facelets[i][(ori + 1) % 3]]
-        c2 = cube_string[corner_facelets[i][(ori + 2) % 3]]
-
-        # find which canonical corner cubie matches these two colors
-        found = False
-        for j in range(8):
-            if c1 == corner_colors[j][1] and c2 == corner_colors[j][2]:
-                cp[i] = j
-                co[i] = ori % 3
-                found = True
-                break
-
-        if not found:
+    cp, co = [], []
+    for i, (a, b, c) in enumerate(corner_facelets):
+        hit = CORNER_LOOKUP.get((cube_string[a], cube_string[b], cube_string[c]))
+        if hit is None:
             raise ValueError(f"Invalid corner cubie colors at corner position {i}")
+        cp.append(hit[0])
+        co.append(hit[1])
 
     # Ensure cp is a proper permutation of 0..7
-    if sorted(cp) != list(range(8)):
+    if len(set(cp)) != 8:
         raise ValueError("Corner permutation is invalid – duplicate or missing corner.")
 
     return cp, co
@@ -174,37 +329,17 @@ def extract_edges(cube_string):
     From a 54-character cube_string, compute:
       - ep: edge permutation (list of 12 ints, each in 0..11)
       - eo: edge orientation (list of 12 ints, each in {0,1})
-
-    Mirrors Kociemba's FaceCube -> CubieCube edge extraction.
     """
-    ep = [None] * 12  # which cubie is in each edge position
-    eo = [0] * 12     # orientation for each edge
-
-    for i in range(12):  # for each edge position
-        c0 = cube_string[edge_facelets[i][0]]
-        c1 = cube_string[edge_facelets[i][1]]
-        found = False
-
-        for j in range(12):
-            # orientation 0: colors match in the same order
-            if c0 == edge_colors[j][0] and c1 == edge_colors[j][1]:
-                ep[i] = j
-                eo[i] = 0
-                found = True
-                break
-
-            # orientation 1: colors reversed
-            if c0 == edge_colors[j][1] and c1 == edge_colors[j][0]:
-                ep[i] = j
-                eo[i] = 1
-                found = True
-                break
-
-        if not found:
+    ep, eo = [], []
+    for i, (a, b) in enumerate(edge_facelets):
+        hit = EDGE_LOOKUP.get((cube_string[a], cube_string[b]))
+        if hit is None:
             raise ValueError(f"Invalid edge cubie colors at edge position {i}")
+        ep.append(hit[0])
+        eo.append(hit[1])
 
     # Ensure ep is a proper permutation of 0..11
-    if sorted(ep) != list(range(12)):
+    if len(set(ep)) != 12:
         raise ValueError("Edge permutation is invalid – duplicate or missing edge.")
 
     return ep, eo
@@ -228,53 +363,180 @@ def is_cube_solvable(cube_string: str) -> bool:
     if len(cube_string) != 54:
         raise ValueError("Cube string must have length 54.")
 
-    # Extract cubie-level representation
-    cp, co = extract_corners(cube_string)
-    ep, eo = extract_edges(cube_string)
-
-    # Corner orientation sum must be 0 mod 3
-    if not check_corner_orientation(co):
-        raise ValueError("Corner orientation invalid — cube is unsolvable.")
-
-    # Edge orientation sum must be 0 mod 2
-    if not check_edge_orientation(eo):
-        raise ValueError("Edge orientation invalid — cube is unsolvable.")
-
-    # Parity of corners and edges must match
-    if not check_parity(cp, ep):
-        raise ValueError("Corner and edge permutation parity do not match — cube is unsolvable.")
+    result = validate_cube(cube_string)
+    if not result.ok:
+        raise ValueError(result.reason)
 
     # If we reach here, all checks passed
     return True
 
 
+# ----------------------------------------------------------------------
+# Batch API: validate an (N, 54) array of states at once
+# ----------------------------------------------------------------------
+# Rows are encoded as letter codes (index into "URFDLB", 6 = any other
+# character). The lookup tables above are baked into small arrays indexed
+# by the encoded colour tuple (base 7), so classifying every cubie of the
+# whole batch is a couple of gathers over corner_facelets / edge_facelets.
+
+_LETTERS = "URFDLB"
+_OTHER = len(_LETTERS)
+_CODE_OF_BYTE = np.full(256, _OTHER, dtype=np.uint8)
+_CODE_OF_BYTE[np.frombuffer(_LETTERS.encode("ascii"), dtype=np.uint8)] = np.arange(6, dtype=np.uint8)
+
+_CORNER_IDX = np.array(corner_facelets, dtype=np.intp)  # (8, 3)
+_EDGE_IDX = np.array(edge_facelets, dtype=np.intp)      # (12, 2)
+
+_CORNER_PIECE = np.full(7 ** 3, -1, dtype=np.int8)  # -1 = impossible cubie
+_CORNER_TWIST = np.zeros(7 ** 3, dtype=np.int8)
+for _cols, (_j, _o) in CORNER_LOOKUP.items():
+    _code = _LETTERS.index(_cols[0]) * 49 + _LETTERS.index(_cols[1]) * 7 + _LETTERS.index(_cols[2])
+    _CORNER_PIECE[_code], _CORNER_TWIST[_code] = _j, _o
+
+_EDGE_PIECE = np.full(7 ** 2, -1, dtype=np.int8)
+_EDGE_FLIP = np.zeros(7 ** 2, dtype=np.int8)
+for _cols, (_j, _o) in EDGE_LOOKUP.items():
+    _code = _LETTERS.index(_cols[0]) * 7 + _LETTERS.index(_cols[1])
+    _EDGE_PIECE[_code], _EDGE_FLIP[_code] = _j, _o
+
+
+@dataclass
+class BatchValidationResult:
+    """
+    Per-row outcome of validate_many / validate_codes.
+      ok:         bool mask, True where the state is solvable
+      code:       uint8 failure code per row (OK, FAIL_COUNTS, ...), matching
+                  validate_cube(row).code
+      bad_cubies: number of impossible corners + edges per row (0 unless the
+                  colour counts are valid, like validate_cube)
+    """
+    ok: np.ndarray
+    code: np.ndarray
+    bad_cubies: np.ndarray
 
+    def failed(self, code: int) -> np.ndarray:
+        """Boolean mask of the rows that failed with the given code."""
+        return self.code == code
 
+    def score(self) -> np.ndarray:
+        """Vectorized ValidationResult.score()."""
+        return self.bad_cubies * 10 + np.where(self.ok, 0, 100)
 
 
+def _permutation_parity_batch(perm: np.ndarray) -> np.ndarray:
+    """Parity (0 even, 1 odd) of each row of an (N, k) permutation array, via inversion count."""
+    k = perm.shape[1]
+    upper = np.triu(np.ones((k, k), dtype=bool), 1)
+    inversions = ((perm[:, :, None] > perm[:, None, :]) & upper).sum(axis=(1, 2))
+    return inversions & 1
 
 
+def encode_states(states) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a batch of cube states to (codes, length_ok):
+      codes      (N, 54) uint8 letter codes, 0..5 for URFDLB and 6 otherwise
+      length_ok  (N,) bool, False for strings that are not 54 characters
+
+    Accepted inputs:
+      - (N, 54) uint8 array of ASCII bytes
+      - (N, 54) array of single characters ("S1" / "U1")
+      - (N,) array or list of strings
+    """
+    arr = np.asarray(states)
 
+    if arr.ndim == 1 and arr.dtype.kind in "SUO":
+        strings = [s.decode("ascii") if isinstance(s, bytes) else str(s) for s in arr]
+        length_ok = np.array([len(s) == 54 for s in strings], dtype=bool)
+        padded = "".join(s if len(s) == 54 else "?" * 54 for s in strings)
+        raw = np.frombuffer(padded.encode("ascii", "replace"), dtype=np.uint8).reshape(-1, 54)
+        return _CODE_OF_BYTE[raw], length_ok
 
+    if arr.ndim != 2 or arr.shape[1] != 54:
+        raise ValueError(f"Expected an (N, 54) array of cube states, got shape {arr.shape}")
 
+    if arr.dtype.kind in "SU":
+        arr = np.char.encode(arr, "ascii") if arr.dtype.kind == "U" else arr
+        arr = arr.astype("S1").view(np.uint8)
+    elif arr.dtype != np.uint8:
+        raise ValueError(f"Expected uint8 ASCII codes or single characters, got dtype {arr.dtype}")
 
+    return _CODE_OF_BYTE[arr], np.ones(arr.shape[0], dtype=bool)
 
 
+def validate_codes(codes: np.ndarray, length_ok: Optional[np.ndarray] = None) -> BatchValidationResult:
+    """
+    Run every validate_cube check over an (N, 54) array of letter codes
+    (see encode_states). Each row gets the code of its first failing check.
+    """
+    n = codes.shape[0]
+    if length_ok is None:
+        length_ok = np.ones(n, dtype=bool)
+
+    # Colour counts: one bincount over row-offset codes.
+    offsets = (np.arange(n, dtype=np.intp) * 7)[:, None]
+    counts = np.bincount((codes + offsets).ravel(), minlength=n * 7).reshape(n, 7)
+    counts_ok = length_ok & (counts[:, :6] == 9).all(axis=1)
+
+    c = codes[:, _CORNER_IDX].astype(np.intp)  # (N, 8, 3)
+    corner_code = c[:, :, 0] * 49 + c[:, :, 1] * 7 + c[:, :, 2]
+    cp = _CORNER_PIECE[corner_code]
+    co = _CORNER_TWIST[corner_code]
+
+    e = codes[:, _EDGE_IDX].astype(np.intp)  # (N, 12, 2)
+    edge_code = e[:, :, 0] * 7 + e[:, :, 1]
+    ep = _EDGE_PIECE[edge_code]
+    eo = _EDGE_FLIP[edge_code]
+
+    bad = (cp < 0).sum(axis=1) + (ep < 0).sum(axis=1)
+    duplicate = ~(np.sort(cp, axis=1) == np.arange(8)).all(axis=1)
+    duplicate |= ~(np.sort(ep, axis=1) == np.arange(12)).all(axis=1)
+    twist = co.sum(axis=1, dtype=np.int32) % 3 != 0
+    flip = eo.sum(axis=1, dtype=np.int32) % 2 != 0
+
+    # Parity is only needed for rows that passed everything else.
+    parity = np.zeros(n, dtype=bool)
+    rows = np.flatnonzero(counts_ok & (bad == 0) & ~duplicate & ~twist & ~flip)
+    if rows.size:
+        parity[rows] = _permutation_parity_batch(cp[rows]) != _permutation_parity_batch(ep[rows])
+
+    code = np.select(
+        [~length_ok, ~counts_ok, bad > 0, duplicate, twist, flip, parity],
+        [FAIL_LENGTH, FAIL_COUNTS, FAIL_CUBIE, FAIL_DUPLICATE, FAIL_TWIST, FAIL_FLIP, FAIL_PARITY],
+        OK,
+    ).astype(np.uint8)
+
+    return BatchValidationResult(
+        ok=code == OK,
+        code=code,
+        bad_cubies=np.where(counts_ok, bad, 0),
+    )
+
+
+def validate_many(states, chunk_size: int = 65536) -> BatchValidationResult:
+    """
+    Vectorized validate_cube for a batch of states (any input accepted by
+    encode_states). Row i of the result agrees with validate_cube(states[i])
+    and with is_cube_solvable(states[i]) (ok exactly where it returns True).
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    Rows are processed chunk_size at a time to bound temporary memory.
+    """
+    if len(states) == 0:
+        return BatchValidationResult(
+            ok=np.zeros(0, dtype=bool),
+            code=np.zeros(0, dtype=np.uint8),
+            bad_cubies=np.zeros(0, dtype=np.intp),
+        )
+
+    codes, length_ok = encode_states(states)
+    if codes.shape[0] <= chunk_size:
+        return validate_codes(codes, length_ok)
+
+    parts = [
+        validate_codes(codes[i:i + chunk_size], length_ok[i:i + chunk_size])
+        for i in range(0, codes.shape[0], chunk_size)
+    ]
+    return BatchValidationResult(
+        ok=np.concatenate([p.ok for p in parts]),
+        code=np.concatenate([p.code for p in parts]),
+        bad_cubies=np.concatenate([p.bad_cubies for p in parts]),
+    )
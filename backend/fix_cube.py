@@ -2,373 +2,262 @@
 # Whole-cube rotation search (24 orientations) + strong physical validation diagnostics
 # PLUS: per-face 0/90/180/270 rotation search (physics-safe) to fix scanning face-rotation mismatches
 # Input/Output: facelet string in URFDLB order (len 54), letters must be U R F D L B.
+#
+# Run from the project root (it imports the backend package):
+#     python -m backend.fix_cube <RAW_54_CHAR_STRING>
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import Callable, Iterator, List, Tuple, Optional
+from functools import lru_cache
 from itertools import product
 
+import numpy as np
+
+from backend.cube_validation import (
+    CORNER_LOOKUP,
+    EDGE_LOOKUP,
+    ValidationResult,
+    corner_facelets,
+    edge_facelets,
+    encode_states,
+    validate_codes,
+    validate_cube,
+)
+from backend.cube_state import (
+    BASE,
+    ORIENTATIONS,
+    CubeState,
+    face_permutation,
+    face_rotations_permutation,
+    permutation_closure,
+)
+
 
 # ----------------------------
 # Facelet helpers (URFDLB)
 # ----------------------------
-BASE = {"U": 0, "R": 9, "F": 18, "D": 27, "L": 36, "B": 45}
-
 def face_slice(cube: str, face: str) -> str:
     b = BASE[face]
     return cube[b:b+9]
 
-def set_face(cube: str, face: str, new9: str) -> str:
-    b = BASE[face]
-    return cube[:b] + new9 + cube[b+9:]
-
-def rot_face_cw(f: str) -> str:
-    return (
-        f[6] + f[3] + f[0] +
-        f[7] + f[4] + f[1] +
-        f[8] + f[5] + f[2]
-    )
-
-def rot_face_ccw(f: str) -> str:
-    return (
-        f[2] + f[5] + f[8] +
-        f[1] + f[4] + f[7] +
-        f[0] + f[3] + f[6]
-    )
-
-def rot_face_180(f: str) -> str:
-    return f[::-1]
-
 
 # ----------------------------
 # Whole-cube rotations (x,y,z)
 # ----------------------------
-# These are physical cube rotations in space.
+# These are physical cube rotations in space, expressed as face-level
+# permutations: target face <- (source face, in-plane quarter turns cw).
+# NOTE: ROT_Y/ROT_Z move the side faces one way but spin U/D (F/B) the
+# other, so together they generate more than the 24 rigid orientations
+# (up to 192 distinct states). The search below relies on that wider set,
+# so the tables are kept exactly as the original string rotations.
+ROT_X = face_permutation({
+    "U": ("F", 0), "F": ("D", 0), "D": ("B", 2), "B": ("U", 2),
+    "R": ("R", 1), "L": ("L", 3),
+})
+ROT_Y = face_permutation({
+    "F": ("L", 0), "R": ("F", 0), "B": ("R", 0), "L": ("B", 0),
+    "U": ("U", 1), "D": ("D", 3),
+})
+ROT_Z = face_permutation({
+    "U": ("R", 1), "R": ("D", 1), "D": ("L", 1), "L": ("U", 1),
+    "F": ("F", 1), "B": ("B", 3),
+})
+
+# Every composition of ROT_X/ROT_Y/ROT_Z, precomputed once.
+WHOLE_CUBE_ROTATIONS = permutation_closure([ROT_X, ROT_Y, ROT_Z])
+
 def rot_x(c: str) -> str:
-    U, R, F, D, L, B = (face_slice(c, x) for x in "URFDLB")
-
-    newU = F
-    newF = D
-    newD = rot_face_180(B)
-    newB = rot_face_180(U)
-
-    newR = rot_face_cw(R)
-    newL = rot_face_ccw(L)
-
-    out = c
-    out = set_face(out, "U", newU)
-    out = set_face(out, "R", newR)
-    out = set_face(out, "F", newF)
-    out = set_face(out, "D", newD)
-    out = set_face(out, "L", newL)
-    out = set_face(out, "B", newB)
-    return out
+    return str(CubeState(c).permute(ROT_X))
 
 def rot_y(c: str) -> str:
-    U, R, F, D, L, B = (face_slice(c, x) for x in "URFDLB")
-
-    newF = L
-    newR = F
-    newB = R
-    newL = B
-
-    newU = rot_face_cw(U)
-    newD = rot_face_ccw(D)
-
-    out = c
-    out = set_face(out, "U", newU)
-    out = set_face(out, "R", newR)
-    out = set_face(out, "F", newF)
-    out = set_face(out, "D", newD)
-    out = set_face(out, "L", newL)
-    out = set_face(out, "B", newB)
-    return out
+    return str(CubeState(c).permute(ROT_Y))
 
 def rot_z(c: str) -> str:
-    U, R, F, D, L, B = (face_slice(c, x) for x in "URFDLB")
-
-    newU = rot_face_cw(R)   # R -> U
-    newR = rot_face_cw(D)   # D -> R
-    newD = rot_face_cw(L)   # L -> D
-    newL = rot_face_cw(U)   # U -> L
-
-    newF = rot_face_cw(F)
-    newB = rot_face_ccw(B)
-
-    out = c
-    out = set_face(out, "U", newU)
-    out = set_face(out, "R", newR)
-    out = set_face(out, "F", newF)
-    out = set_face(out, "D", newD)
-    out = set_face(out, "L", newL)
-    out = set_face(out, "B", newB)
+    return str(CubeState(c).permute(ROT_Z))
+
+def whole_cube_rotations(state: CubeState) -> List[CubeState]:
+    """Distinct states reachable from state by whole-cube rotations."""
+    seen = set()
+    out = []
+    for p in WHOLE_CUBE_ROTATIONS:
+        data = p.apply(state.data)
+        if data not in seen:
+            seen.add(data)
+            out.append(CubeState(data))
     return out
 
 def all_24_orientations(c: str) -> List[str]:
     if len(c) != 54:
         return []
-    seen = {c}
-    q = [c]
-    while q:
-        cur = q.pop(0)
-        for nxt in (rot_x(cur), rot_y(cur), rot_z(cur)):
-            if nxt not in seen:
-                seen.add(nxt)
-                q.append(nxt)
-    return list(seen)  # should be 24
+    return [str(s) for s in whole_cube_rotations(CubeState(c))]
 
 
 # ----------------------------
 # Per-face rotation search (physics-safe)
 # ----------------------------
-def face_rotations_4(face9: str) -> List[str]:
-    """All 4 in-plane rotations of a 3x3 face."""
-    r0 = face9
-    r1 = rot_face_cw(r0)
-    r2 = rot_face_cw(r1)
-    r3 = rot_face_cw(r2)
-    return [r0, r1, r2, r3]
-
 def cube_with_face_rotations(raw: str, rots: Tuple[int,int,int,int,int,int]) -> str:
     """Apply per-face rotations to URFDLB faces of the cube string."""
-    U = face_slice(raw, "U")
-    R = face_slice(raw, "R")
-    F = face_slice(raw, "F")
-    D = face_slice(raw, "D")
-    L = face_slice(raw, "L")
-    B = face_slice(raw, "B")
-
-    Uv = face_rotations_4(U)[rots[0]]
-    Rv = face_rotations_4(R)[rots[1]]
-    Fv = face_rotations_4(F)[rots[2]]
-    Dv = face_rotations_4(D)[rots[3]]
-    Lv = face_rotations_4(L)[rots[4]]
-    Bv = face_rotations_4(B)[rots[5]]
-
-    out = raw
-    out = set_face(out, "U", Uv)
-    out = set_face(out, "R", Rv)
-    out = set_face(out, "F", Fv)
-    out = set_face(out, "D", Dv)
-    out = set_face(out, "L", Lv)
-    out = set_face(out, "B", Bv)
-    return out
+    return str(CubeState(raw).rotate_faces(rots))
 
 
 # ----------------------------
 # Cubie validation (Kociemba mapping)
 # ----------------------------
-# Corner positions: URF, UFL, ULB, UBR, DFR, DLF, DBL, DRB
-CORNER_FACELETS = [
-    (("U", 8), ("R", 0), ("F", 2)),  # URF
-    (("U", 6), ("F", 0), ("L", 2)),  # UFL
-    (("U", 0), ("L", 0), ("B", 2)),  # ULB
-    (("U", 2), ("B", 0), ("R", 2)),  # UBR
-    (("D", 2), ("F", 8), ("R", 6)),  # DFR
-    (("D", 0), ("L", 8), ("F", 6)),  # DLF
-    (("D", 6), ("B", 8), ("L", 6)),  # DBL
-    (("D", 8), ("R", 8), ("B", 6)),  # DRB
-]
-
-# Edge positions: UR, UF, UL, UB, DR, DF, DL, DB, FR, FL, BL, BR
-EDGE_FACELETS = [
-    (("U", 5), ("R", 1)),  # UR
-    (("U", 7), ("F", 1)),  # UF
-    (("U", 3), ("L", 1)),  # UL
-    (("U", 1), ("B", 1)),  # UB
-    (("D", 5), ("R", 7)),  # DR
-    (("D", 1), ("F", 7)),  # DF
-    (("D", 3), ("L", 7)),  # DL
-    (("D", 7), ("B", 7)),  # DB
-    (("F", 5), ("R", 3)),  # FR
-    (("F", 3), ("L", 5)),  # FL
-    (("B", 5), ("L", 3)),  # BL
-    (("B", 3), ("R", 5)),  # BR
-]
-
-LEGAL_CORNERS = [
-    tuple("URF"), tuple("UFL"), tuple("ULB"), tuple("UBR"),
-    tuple("DFR"), tuple("DLF"), tuple("DBL"), tuple("DRB"),
-]
-LEGAL_EDGES = [
-    tuple("UR"), tuple("UF"), tuple("UL"), tuple("UB"),
-    tuple("DR"), tuple("DF"), tuple("DL"), tuple("DB"),
-    tuple("FR"), tuple("FL"), tuple("BL"), tuple("BR"),
-]
-
-def get_facelet(cube: str, face: str, idx: int) -> str:
-    return cube[BASE[face] + idx]
-
-def corner_colors(cube: str, pos: int) -> Tuple[str, str, str]:
-    a, b, c = CORNER_FACELETS[pos]
-    return (
-        get_facelet(cube, a[0], a[1]),
-        get_facelet(cube, b[0], b[1]),
-        get_facelet(cube, c[0], c[1]),
-    )
-
-def edge_colors(cube: str, pos: int) -> Tuple[str, str]:
-    a, b = EDGE_FACELETS[pos]
-    return (
-        get_facelet(cube, a[0], a[1]),
-        get_facelet(cube, b[0], b[1]),
-    )
-
-def parity_of_perm(p: List[int]) -> int:
-    visited = [False] * len(p)
-    swaps_parity = 0
-    for i in range(len(p)):
-        if visited[i]:
-            continue
-        j = i
-        cycle = []
-        while not visited[j]:
-            visited[j] = True
-            cycle.append(j)
-            j = p[j]
-        if len(cycle) > 0:
-            swaps_parity ^= ((len(cycle) - 1) % 2)
-    return swaps_parity  # 0 even, 1 odd
+# validate_cube / ValidationResult live in cube_validation, shared with
+# is_cube_solvable; they are re-exported here for existing callers.
+
+# ----------------------------
+# Batched candidate validation (NumPy)
+# ----------------------------
+# Every candidate is one row of an (N, 54) uint8 array of letter codes
+# (index into LETTERS), the encoding used by cube_validation.validate_codes,
+# so a whole batch is validated with a handful of gathers.
+LETTERS = "URFDLB"
+_LETTER_BYTES = np.frombuffer(LETTERS.encode("ascii"), dtype=np.uint8)
+
+
+def _encode(cube: str) -> np.ndarray:
+    codes, _ = encode_states([cube])
+    return codes[0]
+
+
+def validate_batch(cands: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized validate_cube over an (N, 54) array of letter codes.
+    Returns (ok mask, score) per row; score matches ValidationResult.score().
+    """
+    result = validate_codes(cands)
+    return result.ok, result.score()
+
+
+@lru_cache(maxsize=None)
+def _candidate_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Index tables for the search, built once:
+      stage 0: (192, 54)    whole-cube rotations of the raw scan
+      stage 1: (98304, 54)  24 orientations x 4^6 per-face rotations
+    Composing ROT_X/ROT_Y/ROT_Z with the per-face rotations yields exactly
+    the same candidate set as the 24 rigid orientations do, so stage 1
+    enumerates every distinct candidate once.
+    """
+    stage0 = np.array([p.indices for p in WHOLE_CUBE_ROTATIONS], dtype=np.uint8)
+    face_rots = np.array(
+        [face_rotations_permutation(rots).indices for rots in product(range(4), repeat=6)],
+        dtype=np.uint8,
+    )  # (4096, 54)
+    orients = np.array([p.indices for p in ORIENTATIONS], dtype=np.intp)  # (24, 54)
+    stage1 = face_rots[:, orients].reshape(-1, 54)
+    return stage0, stage1
+
+
+def _decode(row: np.ndarray) -> str:
+    return _LETTER_BYTES[row].tobytes().decode("ascii")
+
+
+# ----------------------------
+# Constraint-pruned per-face rotation search
+# ----------------------------
+# Faces get their in-plane rotation one at a time (URFDLB). As soon as all
+# faces of a corner/edge are assigned, its colours are looked up in
+# CORNER_LOOKUP/EDGE_LOOKUP. An impossible cubie stays impossible for every
+# rotation of the remaining faces and every whole-cube orientation, so the
+# branch is dropped. Twist/flip/parity are left to the leaf check.
+_FACE_ORDER = "URFDLB"
+
+def _completed_at(cubies) -> List[List[Tuple[int, ...]]]:
+    """Facelet indices of the cubies that become fully assigned at each depth."""
+    out = [[] for _ in _FACE_ORDER]
+    for facelets in cubies:
+        depth = max(i // 9 for i in facelets)  # URFDLB blocks of 9
+        out[depth].append(tuple(facelets))
+    return out
+
+_CORNERS_COMPLETED_AT = _completed_at(corner_facelets)
+_EDGES_COMPLETED_AT = _completed_at(edge_facelets)
 
 
 @dataclass
-class ValidationResult:
-    ok: bool
-    reason: str
-    bad_corners: List[Tuple[int, Tuple[str, str, str]]]
-    bad_edges: List[Tuple[int, Tuple[str, str]]]
-    counts: Optional[dict] = None
-    corner_twist_sum_mod3: Optional[int] = None
-    edge_flip_sum_mod2: Optional[int] = None
-    corner_parity: Optional[int] = None
-    edge_parity: Optional[int] = None
-
-    def score(self) -> int:
-        # lower is better
-        return len(self.bad_corners) * 10 + len(self.bad_edges) * 10 + (0 if self.ok else 100)
-
-
-def validate_cube(cube: str) -> ValidationResult:
-    if len(cube) != 54:
-        return ValidationResult(False, "Length != 54", [], [], counts=None)
-
-    letters = "URFDLB"
-    counts = {ch: cube.count(ch) for ch in letters}
-    if any(counts[ch] != 9 for ch in letters):
-        return ValidationResult(False, f"Bad counts: {counts}", [], [], counts=counts)
-
-    # corners
-    legal_corner_sets = [set(x) for x in LEGAL_CORNERS]
-    corner_perm = [-1] * 8
-    corner_ori = [0] * 8
-    bad_corners = []
-
-    for i in range(8):
-        cols = corner_colors(cube, i)
-        s = set(cols)
-        if s not in legal_corner_sets:
-            bad_corners.append((i, cols))
-            continue
-        piece_idx = next(j for j, cc in enumerate(LEGAL_CORNERS) if set(cc) == s)
-        corner_perm[i] = piece_idx
-
-        # corner twist: where is U or D within the triplet
-        if cols[0] in ("U", "D"):
-            corner_ori[i] = 0
-        elif cols[1] in ("U", "D"):
-            corner_ori[i] = 1
-        else:
-            corner_ori[i] = 2
-
-    # edges
-    legal_edge_sets = [set(x) for x in LEGAL_EDGES]
-    edge_perm = [-1] * 12
-    edge_ori = [0] * 12
-    bad_edges = []
-
-    for i in range(12):
-        cols = edge_colors(cube, i)
-        s = set(cols)
-        if s not in legal_edge_sets:
-            bad_edges.append((i, cols))
-            continue
-        piece_idx = next(j for j, ee in enumerate(LEGAL_EDGES) if set(ee) == s)
-        edge_perm[i] = piece_idx
-
-        a, b = cols
-        (f1, _), (f2, _) = EDGE_FACELETS[i]
-
-        if "U" in s or "D" in s:
-            if (a in ("U", "D") and f1 in ("U", "D")) or (b in ("U", "D") and f2 in ("U", "D")):
-                edge_ori[i] = 0
-            else:
-                edge_ori[i] = 1
-        else:
-            if (a in ("F", "B") and f1 in ("F", "B")) or (b in ("F", "B") and f2 in ("F", "B")):
-                edge_ori[i] = 0
+class FaceRotationSearch:
+    cube: Optional[str]                      # accepted candidate, or None
+    rots: Optional[Tuple[int, ...]]          # URFDLB quarter turns that produced it
+    nodes: int                               # face assignments tried
+    leaves: int                              # full assignments with only legal cubies
+    checked: int = 0                         # leaves passed on to an expensive final check
+
+    # 4 + 4^2 + ... + 4^6: nodes an exhaustive enumeration would visit
+    EXHAUSTIVE_NODES = 5460
+
+
+def iter_face_rotations(raw: str, stats: FaceRotationSearch) -> Iterator[Tuple[Tuple[int, ...], CubeState]]:
+    """
+    Backtracking search over per-face rotations of raw. Yields (rots, candidate)
+    for every leaf whose corners and edges are all legal colour sets, and
+    keeps stats.nodes / stats.leaves up to date as it goes.
+    """
+    state = CubeState(raw)
+    work = list(str(state))
+    rots = [0] * 6
+
+    # Distinct in-plane rotations per face (symmetric faces need fewer).
+    options = []
+    for f in _FACE_ORDER:
+        seen = {}
+        for k in range(4):
+            seen.setdefault(state.rotate_face(f, k).face(f), k)
+        options.append([(k, letters) for letters, k in seen.items()])
+
+    def legal(depth: int) -> bool:
+        for a, b, c in _CORNERS_COMPLETED_AT[depth]:
+            if (work[a], work[b], work[c]) not in CORNER_LOOKUP:
+                return False
+        for a, b in _EDGES_COMPLETED_AT[depth]:
+            if (work[a], work[b]) not in EDGE_LOOKUP:
+                return False
+        return True
+
+    def visit(depth: int):
+        b = BASE[_FACE_ORDER[depth]]
+        for k, letters in options[depth]:
+            stats.nodes += 1
+            work[b:b+9] = letters
+            rots[depth] = k
+            if not legal(depth):
+                continue
+            if depth == 5:
+                stats.leaves += 1
+                yield tuple(rots), CubeState("".join(work))
             else:
-                edge_ori[i] = 1
-
-    if bad_corners or bad_edges:
-        return ValidationResult(
-            False,
-            "Some corner/edge color SETS are impossible (at least 1 sticker is wrong).",
-            bad_corners,
-            bad_edges,
-            counts=counts
-        )
-
-    # duplicates check
-    if len(set(corner_perm)) != 8:
-        return ValidationResult(False, "Duplicate corner cubie detected.", [], [], counts=counts)
-    if len(set(edge_perm)) != 12:
-        return ValidationResult(False, "Duplicate edge cubie detected.", [], [], counts=counts)
-
-    twist = sum(corner_ori) % 3
-    flip = sum(edge_ori) % 2
-    if twist != 0:
-        return ValidationResult(
-            False,
-            "Corner twist sum invalid (one corner is twisted in scan).",
-            [], [],
-            counts=counts,
-            corner_twist_sum_mod3=twist,
-            edge_flip_sum_mod2=flip
-        )
-    if flip != 0:
-        return ValidationResult(
-            False,
-            "Edge flip sum invalid (one edge is flipped in scan).",
-            [], [],
-            counts=counts,
-            corner_twist_sum_mod3=twist,
-            edge_flip_sum_mod2=flip
-        )
-
-    cpar = parity_of_perm(corner_perm)
-    epar = parity_of_perm(edge_perm)
-    if cpar != epar:
-        return ValidationResult(
-            False,
-            "Parity mismatch (two cubies swapped OR one sticker wrong).",
-            [], [],
-            counts=counts,
-            corner_twist_sum_mod3=twist,
-            edge_flip_sum_mod2=flip,
-            corner_parity=cpar,
-            edge_parity=epar
-        )
-
-    return ValidationResult(
-        True,
-        "OK",
-        [], [],
-        counts=counts,
-        corner_twist_sum_mod3=twist,
-        edge_flip_sum_mod2=flip,
-        corner_parity=cpar,
-        edge_parity=epar
-    )
+                yield from visit(depth + 1)
+
+    return visit(0)
+
+
+def search_face_rotations(raw: str, accept: Callable[[CubeState], Optional[str]]) -> FaceRotationSearch:
+    """
+    accept(candidate) runs on every leaf of iter_face_rotations; the first
+    non-None value it returns ends the search.
+    """
+    result = FaceRotationSearch(None, None, 0, 0)
+    for rots, cand in iter_face_rotations(raw, result):
+        found = accept(cand)
+        if found is not None:
+            result.cube, result.rots = found, rots
+            break
+    return result
+
+
+_ORIENTATION_IDX = np.array([p.indices for p in ORIENTATIONS], dtype=np.intp)  # (24, 54)
+
+def first_valid_orientation(state: CubeState) -> Optional[str]:
+    """Leaf check for fix_cube: the first of the 24 orientations that validates, if any."""
+    codes = _encode(str(state))
+    cands = codes[_ORIENTATION_IDX]
+    ok, _ = validate_batch(cands)
+    if ok.any():
+        return _decode(cands[np.argmax(ok)])
+    return None
+
 
 def remap_urfdlb_by_center_colors(cube: str) -> str:
     """
@@ -415,25 +304,35 @@ def fix_cube(raw: str) -> str:
         bad = sorted(set([ch for ch in raw if ch not in allowed]))
         raise ValueError(f"RAW contains invalid letters: {bad} (allowed: URFDLB only)")
 
-    # 0) First try: 24 orientations only (fast)
-    best: Optional[Tuple[str, ValidationResult]] = None
-    for c in all_24_orientations(raw):
-        diag = validate_cube(c)
-        if diag.ok:
-            return c
-        if best is None or diag.score() < best[1].score():
-            best = (c, diag)
-
-    # 1) Physics-safe rescue: per-face rotations (4^6) + 24 orientations
-    best2: Optional[Tuple[str, ValidationResult]] = best
-    for rots in product(range(4), repeat=6):
-        rotated = cube_with_face_rotations(raw, rots)  # URFDLB rotated in-plane
-        for c in all_24_orientations(rotated):
-            diag = validate_cube(c)
-            if diag.ok:
-                return c
-            if best2 is None or diag.score() < best2[1].score():
-                best2 = (c, diag)
+    diag = validate_cube(raw)
+    if diag.counts is None or any(n != 9 for n in diag.counts.values()):
+        # Counts don't change under any rotation; nothing to search.
+        best2: Tuple[str, ValidationResult] = (raw, diag)
+    else:
+        codes = _encode(raw)
+        stage0, stage1 = _candidate_tables()
+
+        # 0) First try: whole-cube rotations only (fast)
+        cands = codes[stage0]
+        ok, score = validate_batch(cands)
+        if ok.any():
+            return _decode(cands[np.argmax(ok)])
+
+        # 1) Physics-safe rescue: per-face rotations (4^6) x 24 orientations,
+        #    pruned on impossible corner/edge colour sets
+        found = search_face_rotations(raw, first_valid_orientation)
+        if found.cube is not None:
+            return found.cube
+
+        # Nothing is valid: score every candidate only to report the closest one.
+        i = int(np.argmin(score))
+        closest = _decode(cands[i])
+        cands1 = codes[stage1]
+        _, score1 = validate_batch(cands1)
+        j = int(np.argmin(score1))
+        if score1[j] < score[i]:
+            closest = _decode(cands1[j])
+        best2 = (closest, validate_cube(closest))
 
     # If none valid, print BEST diagnostic (closest)
     _, d = best2  # type: ignore
@@ -479,11 +378,14 @@ if __name__ == "__main__":
     import sys
     raw = sys.argv[1] if len(sys.argv) > 1 else ""
     if not raw:
-        print("Usage: python fix_cube.py <RAW_54_CHAR_STRING>")
+        print("Usage: python -m backend.fix_cube <RAW_54_CHAR_STRING>")
         sys.exit(1)
 
     print("RAW:", raw)
     print("Length:", len(raw))
+    search = search_face_rotations(raw, first_valid_orientation)
+    print(f"Face-rotation search: {search.nodes} nodes explored "
+          f"(exhaustive: {FaceRotationSearch.EXHAUSTIVE_NODES}), {search.leaves} leaves checked")
     fixed = fix_cube(raw)
     print("\nFIXED STRING:")
     print(fixed)
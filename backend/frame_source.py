@@ -0,0 +1,208 @@
+# frame_source.py
+# Where Webcam.run gets its frames from.
+#
+# A frame source has the two methods Webcam uses on cv2.VideoCapture,
+# read() -> (ok, frame) and release(), plus the frame size. Sources:
+#
+#   CameraSource          live camera (wraps an opened cv2.VideoCapture)
+#   VideoFileSource       a recorded video file, decoded with OpenCV
+#   ImageDirectorySource  a directory of still frames, in file name order
+#   ArraySource           frames already in memory, (N, H, W, 3) uint8
+#   ReplaySource          a raw recording made with qbr --record, memory
+#                         mapped (see recording.py)
+#
+# Offline sources end with read() -> (False, None). PrefetchSource wraps
+# any of them and decodes ahead on a background thread, so decoding
+# overlaps with detection (unlike pipeline.py it never drops a frame).
+
+import abc
+import os
+import queue
+import threading
+from typing import Sequence, Tuple
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+
+
+class FrameSource(abc.ABC):
+    """Base class; subclasses implement read() and set width / height."""
+
+    width = 0
+    height = 0
+    fps = 0.0
+    live = False  # frames arrive in real time (camera) rather than on demand
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    @abc.abstractmethod
+    def read(self) -> Tuple[bool, np.ndarray]:
+        """Next frame as (ok, frame); (False, None) once the source is exhausted."""
+
+    def release(self):
+        pass
+
+    def __iter__(self):
+        while True:
+            ok, frame = self.read()
+            if not ok or frame is None:
+                return
+            yield frame
+
+
+class CameraSource(FrameSource):
+    live = True
+
+    def __init__(self, cam, profile=None):
+        """cam: an opened cv2.VideoCapture; profile: its camera.CameraProfile, if known."""
+        self.cam = cam
+        self.profile = profile
+        if profile is not None:
+            self.width, self.height, self.fps = profile.width, profile.height, profile.fps
+        else:
+            self.width = int(cam.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.height = int(cam.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self.fps = float(cam.get(cv2.CAP_PROP_FPS))
+
+    def read(self):
+        return self.cam.read()
+
+    def release(self):
+        self.cam.release()
+
+
+class VideoFileSource(FrameSource):
+    def __init__(self, path: str):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Could not open video file: {path}")
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = float(self.cap.get(cv2.CAP_PROP_FPS))
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    def __init__(self, path: str):
+        self.path = path
+        self.files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.files:
+            raise ValueError(f"No images found in {path}")
+        self._next = 0
+        first = cv2.imread(self.files[0])
+        if first is None:
+            raise ValueError(f"Could not read image: {self.files[0]}")
+        self.height, self.width = first.shape[:2]
+
+    def read(self):
+        while self._next < len(self.files):
+            frame = cv2.imread(self.files[self._next])
+            self._next += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+
+class ArraySource(FrameSource):
+    """
+    Frames from memory. With copy=False the frames are returned as views,
+    so a consumer that draws on them (Webcam.run with a display) writes
+    into the caller's array.
+    """
+
+    def __init__(self, frames: Sequence[np.ndarray], fps: float = 0.0, copy: bool = True):
+        self.frames = frames
+        self.copy = copy
+        self.fps = fps
+        self._next = 0
+        if len(frames):
+            self.height, self.width = frames[0].shape[:2]
+
+    def read(self):
+        if self._next >= len(self.frames):
+            return False, None
+        frame = self.frames[self._next]
+        self._next += 1
+        return True, (frame.copy() if self.copy else frame)
+
+
+class PrefetchSource(FrameSource):
+    """Reads up to depth frames ahead of the consumer on a background thread."""
+
+    _END = (False, None)
+
+    def __init__(self, source: FrameSource, depth: int = 4):
+        self.source = source
+        self.width, self.height, self.fps = source.width, source.height, source.fps
+        self.live = source.live
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._read_ahead, name="qbr-prefetch", daemon=True)
+        self._thread.start()
+
+    def _read_ahead(self):
+        try:
+            while not self._stop.is_set():
+                ok, frame = self.source.read()
+                if not ok or frame is None:
+                    break
+                self._put((True, frame))
+        finally:
+            self._put(self._END)
+
+    def _put(self, item):
+        # Blocks while the consumer is behind, but gives up once released.
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def read(self):
+        if self._stop.is_set():
+            return self._END
+        item = self._queue.get()
+        if item is self._END:
+            self._stop.set()
+        return item
+
+    def release(self):
+        self._stop.set()
+        self._thread.join()
+        self.source.release()
+
+
+def open_source(spec, prefetch: int = 4) -> FrameSource:
+    """
+    Frame source for spec: a video file, image directory or recording
+    path, or an (N, H, W, 3) array. Offline sources other than recordings
+    (which need no decoding) are wrapped in a PrefetchSource (prefetch=0
+    disables it).
+    """
+    from backend.recording import ReplaySource, is_recording  # recording.py imports this module
+
+    if isinstance(spec, np.ndarray) or isinstance(spec, (list, tuple)):
+        source = ArraySource(spec)
+    elif is_recording(spec):
+        return ReplaySource(spec)
+    elif os.path.isdir(spec):
+        source = ImageDirectorySource(spec)
+    elif os.path.isfile(spec):
+        source = VideoFileSource(spec)
+    else:
+        raise ValueError(f"Not a video file or image directory: {spec}")
+    return PrefetchSource(source, prefetch) if prefetch else source
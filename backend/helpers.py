@@ -1,8 +1,30 @@
 # backend/helpers.py
 
+import json
+import os
+import tempfile
+
 def get_next_locale():
     """
     Minimal stub for compatibility with qbr pipeline.
     Original implementation handled i18n/localization.
     """
-    return "en"
\ No newline at end of file
+    return "en"
+
+def write_json_atomic(path, data):
+    """
+    Write data as JSON to a temp file in the same directory as path, then
+    rename it over path, so readers never see a half-written file.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
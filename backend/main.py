@@ -1,47 +1,28 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import Dict, List
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Union
+from contextlib import asynccontextmanager
+import asyncio
 
-from solver import solve_cube
-from cube_validation import is_cube_solvable
+from concurrent.futures.process import BrokenProcessPool
 
-
-class SolveRequest(BaseModel):
-    cube: str
-app = FastAPI()
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5500",
-        "http://127.0.0.1:5500",
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+from cube_validation import is_cube_solvable, validate_cube
+from solve_cache import SolveCache
+from solve_pool import SolvePool, SolvePoolBroken, SolvePoolFull
+from constants import (
+    SOLVE_CACHE_ENABLED,
+    SOLVE_CACHE_MAX_SIZE,
+    SOLVE_CACHE_TTL_SECONDS,
+    SOLVE_POOL_WORKERS,
+    SOLVE_BATCH_MAX_ITEMS,
+    SOLVE_POOL_MAX_PENDING,
+    SOLVE_TIMEOUT_MS,
+    SOLVE_TIMEOUT_MAX_MS,
 )
 
 
-@app.post("/solve")
-def solve_endpoint(payload: SolveRequest):
-    cube_string = payload.cube
-
-    if len(cube_string) != 54:
-        return JSONResponse(
-            status_code=400,
-            content={"error": "Cube string must have length 54."}
-        )
-
-    if not is_cube_solvable(cube_string):
-        return JSONResponse(
-            status_code=400,
-            content={"error": "Cube is not solvable."}
-        )
-
-    moves = solve_cube(cube_string)
-    return {"moves": moves}
 FACE_ORDER = ["U", "R", "F", "D", "L", "B"]
 
 COLOR_TO_FACE = {
@@ -68,9 +49,6 @@ COLOR_TO_FACE = {
     "B": "B",
 }
 
-class CubeRequest(BaseModel):
-    cube: Dict[str, List[str]]
-
 def normalize_cube_to_facelets(cube: Dict[str, List[str]]) -> str:
     # Require faces U,R,F,D,L,B
     for f in FACE_ORDER:
@@ -98,12 +76,188 @@ def normalize_cube_to_facelets(cube: Dict[str, List[str]]) -> str:
 
     return facelets
 
-@app.post("/solve")
-def solve(req: CubeRequest):
+
+class SolveRequest(BaseModel):
+    # 54-char URFDLB string, or faces like {"U": ["W", ...], ...}
+    cube: Union[str, Dict[str, List[str]]]
+    timeout_ms: Optional[int] = Field(None, gt=0, le=SOLVE_TIMEOUT_MAX_MS)
+
+
+solve_pool = SolvePool(max_workers=SOLVE_POOL_WORKERS, max_pending=SOLVE_POOL_MAX_PENDING)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Warm the worker processes before the first request arrives.
+    solve_pool.start()
+    yield
+    solve_pool.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+# Repeated states (demo scrambles, UI retries) skip the two-phase search.
+solve_cache = SolveCache(
+    max_size=SOLVE_CACHE_MAX_SIZE,
+    ttl_seconds=SOLVE_CACHE_TTL_SECONDS,
+    enabled=SOLVE_CACHE_ENABLED,
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[
+        "http://localhost:5500",
+        "http://127.0.0.1:5500",
+    ],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+async def solve_in_pool(cube_string: str, timeout_ms: Optional[int]):
+    """
+    Run one solve on the worker pool without blocking the event loop.
+    Returns the moves, or a JSONResponse for a full queue or dead
+    workers (503), a missed deadline (504) or a solver error (400).
+    """
+    if timeout_ms is None:
+        timeout_ms = SOLVE_TIMEOUT_MS
+
+    try:
+        future = solve_pool.submit(cube_string)
+    except (SolvePoolFull, SolvePoolBroken) as e:
+        return JSONResponse(
+            status_code=503,
+            content={"error": str(e), "queue_depth": solve_pool.queue_depth}
+        )
+
     try:
-        cube_string = normalize_cube_to_facelets(req.cube)  # ALWAYS URFDLB
-        is_cube_solvable(cube_string)
-        moves = solve_cube(cube_string)
+        # shield(): the future may be shared with other identical requests,
+        # so our own timeout must not cancel it for them.
+        moves, error = await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(future)), timeout_ms / 1000
+        )
+    except asyncio.TimeoutError:
+        # Drops the solve if nobody else waits on it and it hasn't reached a
+        # worker yet; a running solve finishes in the background.
+        solve_pool.abandon(cube_string, future)
+        return JSONResponse(
+            status_code=504,
+            content={
+                "error": f"Solve did not finish within {timeout_ms} ms.",
+                "queue_depth": solve_pool.queue_depth,
+            }
+        )
+    except BrokenProcessPool:
+        # A worker died while this solve was queued; the pool restarts.
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Solver workers died; the pool is being restarted."}
+        )
+
+    if error is not None:
+        return JSONResponse(status_code=400, content={"error": error})
+
+    solve_cache.put(cube_string, moves)
+    return moves
+
+
+@app.post("/solve")
+async def solve_endpoint(payload: SolveRequest):
+    if isinstance(payload.cube, str):
+        cube_string = payload.cube
+        if len(cube_string) != 54:
+            return JSONResponse(
+                status_code=400,
+                content={"error": "Cube string must have length 54."}
+            )
+    else:
+        # Face dicts share cache entries with the equivalent string.
+        try:
+            cube_string = normalize_cube_to_facelets(payload.cube)  # ALWAYS URFDLB
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
+
+    # Only solvable states are ever cached, so a hit skips validation too.
+    moves = solve_cache.get(cube_string)
+    if moves is not None:
         return {"moves": moves}
-    except Exception as e:
-        return JSONResponse(status_code=400, content={"error": str(e)})
\ No newline at end of file
+
+    result = validate_cube(cube_string)
+    if not result.ok:
+        return JSONResponse(
+            status_code=400,
+            content={"error": result.reason}
+        )
+
+    moves = await solve_in_pool(cube_string, payload.timeout_ms)
+    if isinstance(moves, JSONResponse):
+        return moves
+    return {"moves": moves}
+
+
+@app.get("/solve/cache")
+def solve_cache_stats():
+    return solve_cache.stats()
+
+
+@app.get("/solve/pool")
+def solve_pool_stats():
+    return solve_pool.stats()
+
+
+class BatchSolveRequest(BaseModel):
+    cubes: List[Union[str, Dict[str, List[str]]]]
+
+
+@app.post("/solve/batch")
+def solve_batch(req: BatchSolveRequest):
+    """
+    Solve many cubes in one call. Each item is either a 54-char URFDLB
+    string or a face dict like /solve accepts; every item gets its own
+    result or error, in input order.
+    """
+    if len(req.cubes) > SOLVE_BATCH_MAX_ITEMS:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Batch too large: {len(req.cubes)} items (max {SOLVE_BATCH_MAX_ITEMS})."}
+        )
+
+    results = [None] * len(req.cubes)
+    pending = []  # (index, cube_string) still needing a solve
+
+    for i, item in enumerate(req.cubes):
+        try:
+            if isinstance(item, str):
+                cube_string = item.strip()
+                if len(cube_string) != 54:
+                    raise ValueError("Cube string must have length 54.")
+            else:
+                cube_string = normalize_cube_to_facelets(item)
+
+            moves = solve_cache.get(cube_string)
+            if moves is not None:
+                results[i] = {"cube": cube_string, "moves": moves}
+                continue
+
+            is_cube_solvable(cube_string)
+            pending.append((i, cube_string))
+        except Exception as e:
+            results[i] = {"error": str(e)}
+
+    try:
+        outcomes = solve_pool.solve_many(cube_string for _, cube_string in pending)
+    except (SolvePoolBroken, BrokenProcessPool):
+        # A worker died mid-batch; the pool restarts on the next request.
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Solver workers died; the pool is being restarted."}
+        )
+    for (i, cube_string), (moves, error) in zip(pending, outcomes):
+        if error is not None:
+            results[i] = {"cube": cube_string, "error": error}
+        else:
+            solve_cache.put(cube_string, moves)
+            results[i] = {"cube": cube_string, "moves": moves}
+
+    return {"results": results}
@@ -0,0 +1,153 @@
+# overlay.py
+# Cached layers for the OpenCV UI drawn over the camera frame.
+#
+# Text: every label is rendered once with pillow into a small RGBA sprite
+# and cached by (text, size, color, anchor). Drawing a label afterwards is
+# an alpha blend of the sprite into the frame, in place, instead of
+# converting the whole frame to a PIL image and back on every call
+# (see Webcam.render_text).
+#
+# Sticker panels: the tile layout is computed once, the panel image is
+# only repainted when its colors change, and drawing it is one masked
+# copy into the frame (see Webcam.draw_stickers / draw_2d_cube_state).
+
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+STROKE_WIDTH = 1
+
+
+class TextSprite:
+    """Pre-blended text: color * alpha, 255 - alpha, and the offset from the anchor point."""
+
+    __slots__ = ("premultiplied", "inverse_alpha", "offset", "size")
+
+    def __init__(self, rgba: np.ndarray, offset: Tuple[int, int]):
+        alpha = rgba[:, :, 3:4].astype(np.uint16)
+        self.premultiplied = rgba[:, :, :3].astype(np.uint16) * alpha
+        self.inverse_alpha = 255 - alpha
+        self.offset = offset
+        self.size = (rgba.shape[1], rgba.shape[0])  # (width, height)
+
+
+class TextOverlay:
+    """
+    LRU cache of TextSprites plus an in-place blender.
+
+    get_font(size) returns the pillow font for a text size (so the font
+    choice stays with the caller). Colors are used in the frame's own
+    channel order, as the PIL round-trip did.
+    """
+
+    def __init__(self, get_font: Callable, max_sprites: int = 256):
+        self.get_font = get_font
+        self.max_sprites = max_sprites
+        self._sprites = OrderedDict()
+        self._measure = ImageDraw.Draw(Image.new("L", (1, 1)))
+        self.renders = 0
+
+    def sprite(self, text: str, size: int, color=(255, 255, 255), anchor: str = "lt") -> TextSprite:
+        key = (text, size, tuple(color), anchor)
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            return sprite
+
+        font = self.get_font(size)
+        left, top, right, bottom = self._measure.textbbox(
+            (0, 0), text, font=font, anchor=anchor, stroke_width=STROKE_WIDTH
+        )
+        image = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+        ImageDraw.Draw(image).text(
+            (-left, -top), text, font=font, fill=tuple(color) + (255,), anchor=anchor,
+            stroke_width=STROKE_WIDTH, stroke_fill=(0, 0, 0, 255),
+        )
+        sprite = TextSprite(np.asarray(image), (left, top))
+        self.renders += 1
+
+        self._sprites[key] = sprite
+        while len(self._sprites) > self.max_sprites:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def text_size(self, text: str, size: int) -> Tuple[int, int]:
+        """(width, height) of the rendered text, stroke included."""
+        return self.sprite(text, size).size
+
+    def draw(self, frame: np.ndarray, text: str, pos, color=(255, 255, 255), size: int = 20, anchor: str = "lt"):
+        """Blend the text into frame (H, W, 3) uint8, in place, anchored at pos."""
+        sprite = self.sprite(text, size, color, anchor)
+        x = int(pos[0]) + sprite.offset[0]
+        y = int(pos[1]) + sprite.offset[1]
+        w, h = sprite.size
+
+        # Clip the sprite to the frame.
+        fx0, fy0 = max(x, 0), max(y, 0)
+        fx1, fy1 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+        if fx0 >= fx1 or fy0 >= fy1:
+            return
+        sx0, sy0 = fx0 - x, fy0 - y
+        sx1, sy1 = sx0 + (fx1 - fx0), sy0 + (fy1 - fy0)
+
+        roi = frame[fy0:fy1, fx0:fx1]
+        blended = roi * sprite.inverse_alpha[sy0:sy1, sx0:sx1]
+        blended += sprite.premultiplied[sy0:sy1, sx0:sx1]
+        blended += 127  # round instead of truncating
+        roi[:] = blended // 255
+
+
+def grid_tiles(tile: int, gap: int, rows: int = 3, cols: int = 3, x: int = 0, y: int = 0) -> List[Tuple[int, int, int, int]]:
+    """Row-major (x1, y1, x2, y2) tiles of a rows x cols sticker grid, corners inclusive."""
+    return [
+        (x + (tile + gap) * col, y + (tile + gap) * row,
+         x + (tile + gap) * col + tile, y + (tile + gap) * row + tile)
+        for row in range(rows)
+        for col in range(cols)
+    ]
+
+
+class TilePanel:
+    """
+    A set of opaque tiles (1px black border around a filled square, like the
+    two cv2.rectangle calls they replace) composed into one cached image.
+
+    update() repaints only when the state key changes; blit() copies the
+    tiles into the frame through a mask, so gaps between tiles keep showing
+    the camera image.
+    """
+
+    def __init__(self, tiles: Sequence[Tuple[int, int, int, int]]):
+        self.tiles = list(tiles)
+        width = max(t[2] for t in self.tiles) + 1
+        height = max(t[3] for t in self.tiles) + 1
+        self.image = np.zeros((height, width, 3), dtype=np.uint8)
+        self.mask = np.zeros((height, width), dtype=np.uint8)
+        for (x1, y1, x2, y2) in self.tiles:
+            self.mask[y1:y2 + 1, x1:x2 + 1] = 255
+        self._key = None
+        self.renders = 0
+
+    def update(self, key: Hashable, colors: Callable[[], Sequence[Tuple[int, int, int]]]):
+        """Repaint with colors() (one BGR per tile) if key differs from the last update."""
+        if key == self._key:
+            return
+        for (x1, y1, x2, y2), color in zip(self.tiles, colors()):
+            self.image[y1:y2 + 1, x1:x2 + 1] = 0
+            self.image[y1 + 1:y2, x1 + 1:x2] = color
+        self._key = key
+        self.renders += 1
+
+    def blit(self, frame: np.ndarray, x: int, y: int):
+        """Copy the tiles into frame with the panel's top-left corner at (x, y)."""
+        h, w = self.mask.shape
+        fx0, fy0 = max(x, 0), max(y, 0)
+        fx1, fy1 = min(x + w, frame.shape[1]), min(y + h, frame.shape[0])
+        if fx0 >= fx1 or fy0 >= fy1:
+            return
+        sx0, sy0 = fx0 - x, fy0 - y
+        sx1, sy1 = sx0 + (fx1 - fx0), sy0 + (fy1 - fy0)
+        cv2.copyTo(self.image[sy0:sy1, sx0:sx1], self.mask[sy0:sy1, sx0:sx1], frame[fy0:fy1, fx0:fx1])
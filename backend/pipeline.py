@@ -0,0 +1,202 @@
+# pipeline.py
+# Threaded capture -> process -> display pipeline for Webcam.run.
+#
+# Three stages run concurrently, connected by small bounded queues that
+# drop the OLDEST item when full, so a slow stage never makes the others
+# wait and never shows a stale frame:
+#
+#   capture thread   cam.read() in a loop, always keeps the freshest frame
+#   process thread   detection, state updates and overlay drawing
+#                    (Webcam.process_frame)
+#   display (main)   cv2.imshow / waitKey; keys are forwarded to the
+#                    process thread
+#
+# OpenCV's HighGUI must stay on the main thread, hence display runs there.
+# cv2 releases the GIL inside its heavy calls, so the stages overlap on
+# separate cores.
+
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from backend.constants import (
+    PIPELINE_CAPTURE_QUEUE_SIZE,
+    PIPELINE_DISPLAY_QUEUE_SIZE,
+)
+
+ESC_KEY = 27
+NO_KEY = 0xff
+
+
+class DropOldestQueue:
+    """Bounded FIFO; put() on a full queue discards the oldest item instead of blocking."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Oldest item, or None on timeout / once closed and empty."""
+        with self._cond:
+            if not self._items and not self.closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class StageStats:
+    """Per-stage counters: processed items and latency (last / mean / max, in ms)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, started: float):
+        ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.count += 1
+            self.total_ms += ms
+            self.last_ms = ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "last_ms": round(self.last_ms, 3),
+                "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+                "max_ms": round(self.max_ms, 3),
+            }
+
+
+class FramePipeline:
+    """
+    Runs a Webcam's main loop as three stages (see module comment).
+    run() blocks on the display loop until ESC, until webcam.finished, or
+    until the camera stops delivering frames. An exception in a worker
+    stops the pipeline and is re-raised from run().
+    """
+
+    def __init__(self, webcam, window_name: str):
+        self.webcam = webcam
+        self.window_name = window_name
+        self.captured = DropOldestQueue(PIPELINE_CAPTURE_QUEUE_SIZE)
+        self.processed = DropOldestQueue(PIPELINE_DISPLAY_QUEUE_SIZE)
+        self.keys = deque()
+        self.stop = threading.Event()
+        self.stages = {name: StageStats(name) for name in ("capture", "process", "display")}
+        # Capture-to-display latency of each shown frame.
+        self.end_to_end = StageStats("end_to_end")
+        # First exception raised by a worker thread, re-raised by run().
+        self.error = None
+
+    def _capture_loop(self):
+        stats = self.stages["capture"]
+        try:
+            while not self.stop.is_set():
+                started = time.perf_counter()
+                ok, frame = self.webcam.cam.read()
+                if not ok or frame is None:
+                    break
+                stats.record(started)
+                self.captured.put((started, frame))
+        except Exception as e:
+            self.error = e
+        finally:
+            self.stop.set()
+            self.captured.close()
+
+    def _process_loop(self):
+        stats = self.stages["process"]
+        try:
+            while not self.stop.is_set():
+                item = self.captured.get(timeout=0.1)
+                if item is None:
+                    if self.captured.closed:
+                        break
+                    continue
+                captured_at, frame = item
+                key = self.keys.popleft() if self.keys else NO_KEY
+
+                started = time.perf_counter()
+                self.webcam.profiler.start_frame()
+                out = self.webcam.process_frame(frame, key)
+                self.webcam.profiler.end_frame()
+                stats.record(started)
+                self.processed.put((captured_at, out))
+
+                if self.webcam.finished:
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            self.stop.set()
+            self.processed.close()
+
+    def run(self):
+        workers = [
+            threading.Thread(target=self._capture_loop, name="qbr-capture", daemon=True),
+            threading.Thread(target=self._process_loop, name="qbr-process", daemon=True),
+        ]
+        for t in workers:
+            t.start()
+
+        stats = self.stages["display"]
+        try:
+            while True:
+                item = self.processed.get(timeout=0.01)
+                if item is not None:
+                    captured_at, frame = item
+                    started = time.perf_counter()
+                    cv2.imshow(self.window_name, frame)
+                    stats.record(started)
+                    self.end_to_end.record(captured_at)
+                elif self.processed.closed:
+                    break
+
+                key = cv2.waitKey(1) & 0xff
+                if key == ESC_KEY:
+                    break
+                if key != NO_KEY:
+                    self.keys.append(key)
+        finally:
+            self.stop.set()
+            for t in workers:
+                t.join()
+        if self.error is not None:
+            raise self.error
+
+    def stats(self) -> dict:
+        out = {name: s.as_dict() for name, s in self.stages.items()}
+        out["end_to_end"] = self.end_to_end.as_dict()
+        out["dropped"] = {
+            "capture": self.captured.dropped,
+            "display": self.processed.dropped,
+        }
+        return out
@@ -0,0 +1,190 @@
+# profiler.py
+# Per-stage frame timings for the scanning loop (Webcam.run).
+#
+# A frame is timed as a sequence of laps: start_frame() marks the start,
+# every lap(stage) charges the time since the previous lap (or the frame
+# start) to that stage, and end_frame() closes the frame. Stages hit
+# several times in one frame (e.g. detection retried on the full frame
+# after losing the tracked window) are summed.
+#
+# The last `window` frames of every stage are kept in ring buffers for
+# rolling p50 / p95 / max, and every frame can be appended to a CSV or
+# JSONL file (chosen by extension) for offline analysis.
+#
+# toggle() takes effect at the next start_frame(), so a frame is never
+# half-timed. While disabled, lap() is a single attribute check and the
+# hot paths in contours.py skip the call entirely.
+
+import csv
+import json
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# Rolling percentiles reported per stage
+PERCENTILES = (50, 95)
+
+
+class _Ring:
+    """Fixed-size ring buffer of floats."""
+
+    __slots__ = ("values", "count")
+
+    def __init__(self, size: int):
+        self.values = np.zeros(size, dtype=np.float64)
+        self.count = 0
+
+    def push(self, value: float):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def filled(self) -> np.ndarray:
+        return self.values[:min(self.count, len(self.values))]
+
+
+class FrameProfiler:
+    """
+    Rolling per-stage timings of the frame loop, in milliseconds.
+
+    stages fixes the column order of the CSV dump and of summary(); stages
+    lapped but not listed are still tracked and appended after them.
+    """
+
+    def __init__(self, stages: Sequence[str] = (), window: int = 300, output: Optional[str] = None,
+                 hud: bool = True, enabled: bool = False):
+        self.stages = list(stages)
+        self.window = window
+        self.output = output
+        self.hud = hud
+        self.active = enabled   # requested state, applied at start_frame()
+        self.enabled = False    # state of the frame being timed
+
+        self.frames = 0
+        self._rings: Dict[str, _Ring] = {}
+        self._frame_ms = _Ring(window)
+        self._frame_starts = _Ring(window)
+
+        self._frame_start = 0.0
+        self._last = 0.0
+        self._laps: Dict[str, float] = {}
+
+        self._file = None
+        self._writer = None
+        self._columns = []
+
+    def toggle(self):
+        self.active = not self.active
+
+    # ----------------------------
+    # Timing
+    # ----------------------------
+    def start_frame(self):
+        self.enabled = self.active
+        if not self.enabled:
+            return
+        self._frame_start = self._last = time.perf_counter()
+        self._laps = {}
+
+    def lap(self, stage: str):
+        """Charge the time since the previous lap to stage."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._laps[stage] = self._laps.get(stage, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        total = (time.perf_counter() - self._frame_start) * 1000
+        for stage, ms in self._laps.items():
+            ring = self._rings.get(stage)
+            if ring is None:
+                ring = self._rings[stage] = _Ring(self.window)
+                if stage not in self.stages:
+                    self.stages.append(stage)
+            ring.push(ms)
+        self._frame_ms.push(total)
+        self._frame_starts.push(self._frame_start)
+        if self.output:
+            self._dump(total)
+        self.frames += 1
+
+    # ----------------------------
+    # Reporting
+    # ----------------------------
+    @staticmethod
+    def _describe(values: np.ndarray) -> dict:
+        if not len(values):
+            return {}
+        p50, p95 = np.percentile(values, PERCENTILES)
+        return {"p50": float(p50), "p95": float(p95), "max": float(values.max())}
+
+    def fps(self) -> float:
+        """Frame rate over the rolling window."""
+        starts = self._frame_starts.filled()
+        if len(starts) < 2:
+            return 0.0
+        span = starts.max() - starts.min()
+        return (len(starts) - 1) / span if span > 0 else 0.0
+
+    def stats(self) -> dict:
+        """{stage: {p50, p95, max}} over the rolling window, plus the whole frame and fps."""
+        out = {stage: self._describe(self._rings[stage].filled())
+               for stage in self.stages if stage in self._rings}
+        out["frame"] = self._describe(self._frame_ms.filled())
+        out["fps"] = self.fps()
+        return out
+
+    def hud_lines(self, top: int = 3) -> list:
+        """Short text lines for an on-screen HUD: fps and frame time, then the slowest stages."""
+        stats = self.stats()
+        frame = stats.pop("frame")
+        fps = stats.pop("fps")
+        if not frame:
+            return []
+        lines = ["{:.1f} fps  frame p50 {:.1f} / p95 {:.1f} ms".format(fps, frame["p50"], frame["p95"])]
+        slowest = sorted(stats.items(), key=lambda item: -item[1]["p95"])[:top]
+        lines += ["{} p50 {:.2f} / p95 {:.2f} ms".format(stage, s["p50"], s["p95"]) for stage, s in slowest]
+        return lines
+
+    def summary(self) -> str:
+        """Table of the rolling stats, one stage per line."""
+        stats = self.stats()
+        fps = stats.pop("fps")
+        lines = ["{:<22} {:>8} {:>8} {:>8}".format("stage (ms)", "p50", "p95", "max")]
+        for stage, s in stats.items():
+            if s:
+                lines.append("{:<22} {:>8.2f} {:>8.2f} {:>8.2f}".format(stage, s["p50"], s["p95"], s["max"]))
+        lines.append("{} frames, {:.1f} fps".format(self.frames, fps))
+        return "\n".join(lines)
+
+    # ----------------------------
+    # Dump
+    # ----------------------------
+    def _dump(self, total: float):
+        if self._file is None:
+            self._file = open(self.output, "w", newline="")
+            if not self.output.endswith(".jsonl"):
+                self._writer = csv.writer(self._file)
+                self._columns = list(self.stages)
+                self._writer.writerow(["frame", "start", "total_ms"] + self._columns)
+
+        if self._writer is None:
+            record = {"frame": self.frames, "start": self._frame_start, "total_ms": round(total, 4)}
+            record.update((stage, round(ms, 4)) for stage, ms in self._laps.items())
+            self._file.write(json.dumps(record) + "\n")
+        else:
+            # CSV columns are fixed by the header; stages first seen later
+            # are only kept in the rolling stats.
+            self._writer.writerow(
+                [self.frames, "{:.6f}".format(self._frame_start), "{:.4f}".format(total)]
+                + ["{:.4f}".format(self._laps[s]) if s in self._laps else "" for s in self._columns]
+            )
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
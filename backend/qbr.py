@@ -3,16 +3,37 @@
 
 import sys
 import argparse
+import importlib
 import os
-import i18n
-import kociemba
+import time
 
-from backend.fix_cube import fix_cube
-from backend.video import webcam
+_STARTED = time.perf_counter()
+
+from backend.fix_cube import fix_cube, search_face_rotations, FaceRotationSearch
+from backend.cube_validation import validate_cube
+from backend.cube_state import CubeState
 from backend.config import config
 from backend.constants import ROOT_DIR, E_INCORRECTLY_SCANNED, E_ALREADY_SOLVED
-import itertools
-import kociemba
+
+# ---------------- LAZY IMPORTS ----------------
+# cv2 / PIL (through backend.video), kociemba and i18n are only imported
+# on the paths that use them, so importing this module stays cheap and
+# never opens the camera.
+import_timings = {}  # module -> import time (ms), for --profile-startup
+
+
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is None:
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        import_timings[name] = (time.perf_counter() - started) * 1000
+    return module
+
+
+def get_webcam():
+    """The shared Webcam; the camera itself is opened by its first run()."""
+    return lazy_import("backend.video").webcam
 
 def reverse_algorithm(alg: str) -> str:
     moves = alg.strip().split()
@@ -28,46 +49,28 @@ def reverse_algorithm(alg: str) -> str:
 
     return " ".join(reversed_moves)
 
-def rotate_face_cw_str(face9: str) -> str:
-    # face9 is 9 chars, row-major
-    f = list(face9)
-    return "".join([
-        f[6], f[3], f[0],
-        f[7], f[4], f[1],
-        f[8], f[5], f[2],
-    ])
-
-def rotate_face_n(face9: str, n: int) -> str:
-    out = face9
-    for _ in range(n % 4):
-        out = rotate_face_cw_str(out)
-    return out
-
-def try_fix_by_rotating_faces_only(urfdlb54: str):
+def try_fix_by_rotating_faces_only(urfdlb54: str) -> FaceRotationSearch:
     """
     Keep the 6 faces in the same URFDLB slots (centers fixed),
     but try 0/90/180/270 rotation for each face.
-    Return a solvable cube string or None.
+
+    Rotations that leave an impossible corner/edge are pruned, and the
+    remaining candidates go through validate_cube, which accepts exactly
+    the states kociemba solves; so the first one that passes is the
+    answer and kociemba only runs once, on it (in Qbr.run).
+    Result .cube is a solvable string or None.
     """
-    U = urfdlb54[0:9]
-    R = urfdlb54[9:18]
-    F = urfdlb54[18:27]
-    D = urfdlb54[27:36]
-    L = urfdlb54[36:45]
-    B = urfdlb54[45:54]
-
-    faces = [U, R, F, D, L, B]
-
-    for rots in itertools.product([0,1,2,3], repeat=6):  # 4^6 = 4096
-        cand_faces = [rotate_face_n(face, r) for face, r in zip(faces, rots)]
-        cand = "".join(cand_faces)
-        try:
-            kociemba.solve(cand)
-            return cand, rots
-        except Exception:
-            pass
+    checked = 0
 
-    return None, None
+    def solvable(state: CubeState):
+        nonlocal checked
+        checked += 1
+        cand = str(state)
+        return cand if validate_cube(cand).ok else None
+
+    result = search_face_rotations(urfdlb54, solvable)
+    result.checked = checked
+    return result
 # ---------------- CENTER REMAP ----------------
 def remap_scanner_to_standard_by_centers(cube: str) -> str:
     if len(cube) != 54:
@@ -85,24 +88,74 @@ def remap_scanner_to_standard_by_centers(cube: str) -> str:
     if len(center_map) != 6:
         raise ValueError("Invalid centers")
 
-    return "".join(center_map[c] for c in cube)
+    return str(CubeState(cube).relabel(center_map))
 
 # ---------------- I18N ----------------
-locale = 'en'
-
-i18n.load_path.append(os.path.join(ROOT_DIR, 'translations'))
-i18n.set('filename_format', '{locale}.{format}')
-i18n.set('file_format', 'json')
-i18n.set('locale', locale)
-i18n.set('fallback', 'en')
+def setup_i18n(locale='en'):
+    i18n = lazy_import("i18n")
+    path = os.path.join(ROOT_DIR, 'translations')
+    if path not in i18n.load_path:
+        i18n.load_path.append(path)
+    i18n.set('filename_format', '{locale}.{format}')
+    i18n.set('file_format', 'json')
+    i18n.set('locale', locale)
+    i18n.set('fallback', 'en')
+    return i18n
 
 # ---------------- QBR ----------------
 class Qbr:
-    def __init__(self, normalize=False):
+    def __init__(self, normalize=False, pipelined=None, profile=None, profile_startup=False,
+                 rescan_camera=False, palette_profile=None, source=None, headless=False, record=None,
+                 record_frames=None):
         self.normalize = normalize
+        self.pipelined = pipelined
+        # None: leave the profiler as configured; "": enable; path: enable and dump there
+        self.profile = profile
+        self.profile_startup = profile_startup
+        self.rescan_camera = rescan_camera
+        self.palette_profile = palette_profile
+        # Video file / image directory to scan instead of the camera
+        self.source = source
+        self.headless = headless
+        # Raw recording of the scanned frames, replayable with --source
+        self.record = record
+        self.record_frames = record_frames
+
+    def print_startup_report(self, webcam):
+        """Import and camera probe times, and time to first frame since qbr started."""
+        print("\nStartup (ms):")
+        for name, ms in import_timings.items():
+            print(f"  import {name:<24} {ms:>8.1f}")
+        probe = webcam.startup_timings.get('camera_probe_ms')
+        if probe is not None:
+            print(f"  {'camera probe':<31} {probe:>8.1f}")
+        print(f"  {'first frame (since start)':<31} {(webcam.first_frame_at - _STARTED) * 1000:>8.1f}")
 
     def run(self):
-        raw = webcam.run()
+        if self.palette_profile:
+            config.use_palette_profile(self.palette_profile)
+            print(f"Palette profile: {self.palette_profile}"
+                  + ("" if config.get_palette() else " (not calibrated yet, press 'c' to calibrate)"))
+        i18n = setup_i18n()
+        webcam = get_webcam()
+        if self.rescan_camera and not self.source:
+            webcam.open_camera(rescan=True)
+        if self.profile_startup:
+            webcam.on_first_frame = lambda: self.print_startup_report(webcam)
+
+        if self.profile is not None:
+            webcam.profiler.active = True
+            webcam.profiler.output = self.profile or webcam.profiler.output
+
+        if self.record:
+            webcam.record_to(self.record, self.record_frames)
+
+        source = lazy_import("backend.frame_source").open_source(self.source) if self.source else None
+        raw = webcam.run(pipelined=self.pipelined, source=source, headless=self.headless)
+        if webcam.pipeline_stats:
+            print("Pipeline stats:", webcam.pipeline_stats)
+        if webcam.profiler.frames:
+            print(webcam.profiler.summary())
 
         if isinstance(raw, int):
             self.print_E_and_exit(raw)
@@ -120,16 +173,20 @@ class Qbr:
         print("==============================\n")
 
         # If kociemba fails, try rotating faces only (common scan issue)
+        kociemba = lazy_import("kociemba")
         try:
             solution = kociemba.solve(fixed)
         except Exception:
-            alt, rots = try_fix_by_rotating_faces_only(fixed)
-            if alt is None:
+            found = try_fix_by_rotating_faces_only(fixed)
+            print(f"Face-rotation search: {found.nodes} nodes explored "
+                  f"(exhaustive: {FaceRotationSearch.EXHAUSTIVE_NODES}), "
+                  f"{found.checked} candidates validated")
+            if found.cube is None:
                 print("❌ Still unsolvable even after trying all face rotations.")
                 print("Cube string was:", fixed)
                 return
-            print("✅ Solvable after rotating some faces (rots URFDLB):", rots)
-            fixed = alt
+            print("✅ Solvable after rotating some faces (rots URFDLB):", found.rots)
+            fixed = found.cube
             solution = kociemba.solve(fixed)
 
         moves = solution.split()
@@ -153,4 +210,24 @@ class Qbr:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("-n","--normalize",action="store_true")
-    Qbr(parser.parse_args().normalize).run()
+    parser.add_argument("-p","--pipelined",action="store_true", default=None,
+                        help="run capture, processing and display on separate threads")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="OUT",
+                        help="time every frame stage; optionally dump per-frame timings to OUT (.csv or .jsonl)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import and camera probe times once the first frame is shown")
+    parser.add_argument("--rescan-camera", action="store_true",
+                        help="ignore the remembered camera and probe all devices again")
+    parser.add_argument("--palette", metavar="NAME",
+                        help="calibrated palette profile to use and calibrate into (e.g. one per camera/lighting)")
+    parser.add_argument("--source", metavar="PATH",
+                        help="scan a video file, a directory of frames or a --record recording instead of the camera")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window: faces are captured automatically once the preview is stable")
+    parser.add_argument("--record", metavar="OUT",
+                        help="record the raw frames to OUT (.npy, memory mapped) for replay with --source")
+    parser.add_argument("--record-frames", type=int, metavar="N",
+                        help="frames to preallocate for --record (default: RECORD_MAX_FRAMES)")
+    args = parser.parse_args()
+    Qbr(args.normalize, args.pipelined, args.profile, args.profile_startup, args.rescan_camera,
+        args.palette, args.source, args.headless, args.record, args.record_frames).run()
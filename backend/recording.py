@@ -0,0 +1,111 @@
+# recording.py
+# Raw frame recordings for reproducible benchmarks of the vision loop.
+#
+# A recording is two .npy files:
+#
+#   session.npy        (capacity, H, W, 3) uint8 frames, preallocated and
+#                      written in place through a memory map
+#   session.index.npy  float64 capture time of every recorded frame, in
+#                      seconds since the first one; its length is the
+#                      number of valid frames
+#
+# The index is rewritten every RECORD_INDEX_FLUSH_FRAMES frames (after the
+# frames it covers are flushed), so a session that crashes before close()
+# still replays up to the last flush.
+#
+# Both are plain numpy files (np.load works on them). ReplaySource maps
+# the frames read-only and serves them as views into the map, so replay
+# costs no decoding and no copy; the OS pages frames in on demand.
+
+import os
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from backend.constants import RECORD_INDEX_FLUSH_FRAMES
+from backend.frame_source import ArraySource
+
+
+def index_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".index.npy"
+
+
+def is_recording(path: str) -> bool:
+    return path.endswith(".npy") and os.path.isfile(path) and os.path.isfile(index_path(path))
+
+
+class FrameRecorder:
+    """
+    Appends frames of one fixed shape to a preallocated memory-mapped file.
+    Frames of another shape, and frames past capacity, are not recorded
+    (write() returns False and counts them in dropped).
+    """
+
+    def __init__(self, path: str, shape: Tuple[int, int, int], capacity: int,
+                 flush_every: int = RECORD_INDEX_FLUSH_FRAMES):
+        # Like np.save, append .npy so the recording is recognised on replay.
+        self.path = path if path.endswith(".npy") else path + ".npy"
+        self.shape = tuple(shape)
+        self.capacity = capacity
+        self.flush_every = flush_every
+        self.frames = np.lib.format.open_memmap(self.path, mode="w+", dtype=np.uint8, shape=(capacity,) + self.shape)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+        self.dropped = 0
+        self._t0 = None
+        self._write_index()
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        if self.frames is None or self.full or frame.shape != self.shape:
+            self.dropped += 1
+            return False
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self._t0 is None:
+            self._t0 = timestamp
+        self.frames[self.count] = frame
+        self.timestamps[self.count] = timestamp - self._t0
+        self.count += 1
+        if self.flush_every > 0 and self.count % self.flush_every == 0:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Flush the frames so far to disk, then the index that covers them."""
+        if self.frames is None:
+            return
+        self.frames.flush()
+        self._write_index()
+
+    def close(self):
+        """Flush the frames and write the index (the frames file keeps its full capacity)."""
+        self.flush()
+        self.frames = None
+
+    def _write_index(self):
+        # Write beside the index and rename over it, so a crash mid-write
+        # leaves the previous index rather than a truncated one.
+        path = index_path(self.path)
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, self.timestamps[:self.count])
+        os.replace(path + ".tmp", path)
+
+
+class ReplaySource(ArraySource):
+    """
+    Frames of a recording, as read-only views into the memory map.
+    Anything that draws on them has to copy first (Webcam.process_frame does).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.timestamps = np.load(index_path(path))
+        frames = np.load(path, mmap_mode="r")[:len(self.timestamps)]
+        span = self.timestamps[-1] if len(self.timestamps) > 1 else 0.0
+        fps = (len(self.timestamps) - 1) / span if span > 0 else 0.0
+        super().__init__(frames, fps=fps, copy=False)
@@ -1,6 +1,8 @@
 # reorder.py
 # Reorder scanner output into canonical URFDLB face order
 
+from backend.cube_state import FACES, CubeState, face_permutation
+
 def reorder_faces_to_urfdlb(state: str) -> str:
     """
     Takes a 54-char cube string coming from the scanner
@@ -14,25 +16,18 @@ def reorder_faces_to_urfdlb(state: str) -> str:
     if len(state) != 54:
         raise ValueError(f"Expected 54 chars, got {len(state)}")
 
-    # Split into 6 faces of 9 stickers EACH
-    faces = [state[i:i+9] for i in range(0, 54, 9)]
+    state = CubeState(state)
 
     # Identify faces by their center sticker (index 4)
     by_center = {}
-    for face in faces:
-        center = face[4]
-        by_center[center] = face
+    for face in FACES:
+        by_center[state.center(face)] = face
 
-    # Canonical mapping
+    # Canonical mapping: each target slot takes the face with that center
     try:
-        U = by_center["U"]  # white
-        R = by_center["R"]  # red
-        F = by_center["F"]  # green
-        D = by_center["D"]  # yellow
-        L = by_center["L"]  # orange
-        B = by_center["B"]  # blue
+        mapping = {target: (by_center[target], 0) for target in FACES}
     except KeyError as e:
         raise ValueError(f"Missing face with center {e}")
 
     # Return in URFDLB order
-    return U + R + F + D + L + B
\ No newline at end of file
+    return str(state.permute(face_permutation(mapping)))
@@ -0,0 +1,84 @@
+# solve_cache.py
+# Bounded in-process cache of solver results, keyed by the canonical
+# 54-character URFDLB facelet string.
+#
+# Eviction is both size-based (least recently used goes first) and
+# TTL-based (entries older than ttl_seconds are treated as misses).
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+
+class SolveCache:
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = 3600.0,
+                 enabled: bool = True, clock: Callable[[], float] = time.monotonic):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._clock = clock
+        self._entries = OrderedDict()  # cube_string -> (stored_at, moves tuple)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, cube_string: str) -> Optional[List[str]]:
+        """
+        Return the cached moves for cube_string, or None on a miss.
+        Expired entries are dropped on access.
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(cube_string)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, moves = entry
+            if self.ttl_seconds is not None and self._clock() - stored_at > self.ttl_seconds:
+                del self._entries[cube_string]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(cube_string)
+            self.hits += 1
+            return list(moves)
+
+    def put(self, cube_string: str, moves: List[str]):
+        """Store moves for cube_string, evicting the least recently used entry if full."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[cube_string] = (self._clock(), tuple(moves))
+            self._entries.move_to_end(cube_string)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
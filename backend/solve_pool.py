@@ -0,0 +1,269 @@
+# solve_pool.py
+# Warm process pool for running kociemba solves in parallel.
+#
+# Every worker imports kociemba and runs one solve in its initializer,
+# so the pruning tables are loaded before the first real request arrives.
+# If a worker dies (crash, OOM killer) the executor is broken for good;
+# it is then dropped and the next submit starts a fresh warm pool.
+
+import os
+import threading
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Iterable, List, Optional, Tuple
+
+from solver import solve_cube
+
+SOLVED_STATE = "UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB"
+
+# (moves, error) — exactly one of them is set.
+SolveOutcome = Tuple[Optional[List[str]], Optional[str]]
+
+
+def _warm_worker():
+    """Process initializer: import kociemba and touch its tables once."""
+    import kociemba
+    kociemba.solve(SOLVED_STATE)
+
+
+def _ping():
+    return os.getpid()
+
+
+def solve_outcome(cube_string: str) -> SolveOutcome:
+    """Solve one cube, returning the error text instead of raising."""
+    try:
+        return solve_cube(cube_string), None
+    except Exception as e:
+        return None, str(e)
+
+
+def solve_chunk(cube_strings: List[str]) -> List[SolveOutcome]:
+    """Solve a chunk of cubes in one worker round trip."""
+    return [solve_outcome(c) for c in cube_strings]
+
+
+class SolvePoolFull(RuntimeError):
+    """Raised by SolvePool.submit when max_pending single solves are already queued."""
+
+
+class SolvePoolBroken(RuntimeError):
+    """Raised by SolvePool.submit when the worker processes died; the pool restarts on the next call."""
+
+
+class SolvePool:
+    """
+    Process pool with single-flight deduplication: while a cube string is
+    being solved, every other request for the same string (single or batch)
+    waits on the same Future instead of queueing another solve.
+
+    max_pending only limits single solves (submit). Batches are bounded
+    by their own size limit (SOLVE_BATCH_MAX_ITEMS), and a large batch
+    must not make concurrent /solve calls fail with a full queue.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 256):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._inflight = {}  # cube_string -> Future of SolveOutcome
+        self._waiters = {}   # cube_string -> number of callers waiting on it
+        self._singles = set()  # in-flight strings queued by submit(), see max_pending
+        self.coalesced = 0
+
+    def start(self) -> ProcessPoolExecutor:
+        """Create the executor (if needed) and wait until every worker is warm."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_warm_worker,
+                )
+                pings = [self._executor.submit(_ping) for _ in range(self.max_workers)]
+                for p in pings:
+                    p.result()
+            return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of distinct cube strings currently queued or being solved."""
+        return len(self._inflight)
+
+    def submit(self, cube_string: str) -> Future:
+        """
+        Queue one solve and return a Future of its SolveOutcome.
+        If the same cube string is already in flight, its Future is returned.
+
+        Raises SolvePoolFull instead of queueing when max_pending single
+        solves are already waiting, so a burst of slow states can't grow
+        the backlog without bound.
+        """
+        executor = self.start()
+        with self._lock:
+            future = self._inflight.get(cube_string)
+            if future is not None:
+                self._waiters[cube_string] += 1
+                self.coalesced += 1
+                return future
+
+            if len(self._singles) >= self.max_pending:
+                raise SolvePoolFull(f"Solver queue is full ({len(self._singles)} pending).")
+
+            try:
+                future = executor.submit(solve_outcome, cube_string)
+            except BrokenProcessPool:
+                future = None
+            else:
+                self._inflight[cube_string] = future
+                self._waiters[cube_string] = 1
+                self._singles.add(cube_string)
+
+        if future is None:
+            self._drop_executor(executor)
+            raise SolvePoolBroken("Solver workers died; the pool is being restarted.")
+
+        future.add_done_callback(partial(self._on_done, cube_string, executor))
+        return future
+
+    def submit_many(self, cube_strings: List[str]) -> List[Future]:
+        """
+        Queue a batch and return one Future per input, in input order.
+        Duplicates within the batch and strings already in flight share a
+        Future; the rest are sent to the workers in chunks so large batches
+        don't pay one IPC round trip per cube.
+
+        Raises SolvePoolBroken if the workers died; the batch's own Futures
+        are failed first, so nothing coalesced onto them waits forever.
+        """
+        executor = self.start()
+        by_string = {}
+        fresh = []
+
+        with self._lock:
+            for cube_string in cube_strings:
+                if cube_string in by_string:
+                    self.coalesced += 1
+                    continue
+
+                future = self._inflight.get(cube_string)
+                if future is not None:
+                    self._waiters[cube_string] += 1
+                    self.coalesced += 1
+                else:
+                    future = Future()
+                    # Shared with other callers, so nobody may cancel it.
+                    future.set_running_or_notify_cancel()
+                    self._inflight[cube_string] = future
+                    self._waiters[cube_string] = 1
+                    fresh.append(cube_string)
+                by_string[cube_string] = future
+
+        chunksize = max(1, len(fresh) // (self.max_workers * 4))
+        sent = 0
+        try:
+            for start in range(0, len(fresh), chunksize):
+                chunk = fresh[start:start + chunksize]
+                chunk_future = executor.submit(solve_chunk, chunk)
+                sent = start + len(chunk)
+                chunk_future.add_done_callback(partial(self._resolve_chunk, executor, chunk))
+        except Exception as e:
+            for future in self._pop_inflight(fresh[sent:]):
+                future.set_exception(e)
+            if isinstance(e, BrokenProcessPool):
+                self._drop_executor(executor)
+                raise SolvePoolBroken("Solver workers died; the pool is being restarted.") from e
+            raise
+
+        return [by_string[c] for c in cube_strings]
+
+    def _pop_inflight(self, cube_strings: List[str]) -> List[Future]:
+        with self._lock:
+            futures = [self._inflight.pop(c) for c in cube_strings]
+            for c in cube_strings:
+                del self._waiters[c]
+        return futures
+
+    def _resolve_chunk(self, executor: ProcessPoolExecutor, chunk: List[str], chunk_future: Future):
+        futures = self._pop_inflight(chunk)
+
+        error = chunk_future.exception() if not chunk_future.cancelled() else None
+        if isinstance(error, BrokenProcessPool):
+            self._drop_executor(executor)
+        for i, future in enumerate(futures):
+            if chunk_future.cancelled():
+                future.set_result((None, "Solver pool shut down."))
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(chunk_future.result()[i])
+
+    def _on_done(self, cube_string: str, executor: ProcessPoolExecutor, future: Future):
+        with self._lock:
+            if self._inflight.get(cube_string) is future:
+                del self._inflight[cube_string]
+                del self._waiters[cube_string]
+                self._singles.discard(cube_string)
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._drop_executor(executor)
+
+    def _drop_executor(self, executor: ProcessPoolExecutor):
+        """Forget a broken executor, so the next start() builds a new warm pool."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def abandon(self, cube_string: str, future: Future):
+        """
+        Called by a waiter that gave up (e.g. deadline passed). The solve is
+        cancelled only when no other caller is still waiting on it.
+        """
+        with self._lock:
+            if self._inflight.get(cube_string) is not future:
+                return
+            self._waiters[cube_string] -= 1
+            if self._waiters[cube_string] > 0:
+                return
+            # Last waiter: detach it while still holding the lock, so no
+            # submit / submit_many can coalesce onto a Future that is about
+            # to be cancelled. (cancel() runs _on_done, which takes the lock.)
+            del self._inflight[cube_string]
+            del self._waiters[cube_string]
+            self._singles.discard(cube_string)
+
+        # A solve already running can't be cancelled; it finishes unobserved.
+        future.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "queue_depth": len(self._inflight),
+            "single_pending": len(self._singles),
+            "max_pending": self.max_pending,
+            "coalesced": self.coalesced,
+        }
+
+    def solve_many(self, cube_strings: Iterable[str]) -> List[SolveOutcome]:
+        """Solve all cube strings across the pool, preserving input order."""
+        cube_strings = list(cube_strings)
+        if not cube_strings:
+            return []
+        return [self._outcome(f) for f in self.submit_many(cube_strings)]
+
+    @staticmethod
+    def _outcome(future: Future) -> SolveOutcome:
+        try:
+            return future.result()
+        except CancelledError:
+            return None, "Solve was cancelled."
+
+    def shutdown(self):
+        # Shut down outside the lock: cancelling queued solves runs their
+        # done callbacks, which take it.
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,8 @@
+# The API modules (main.py, solve_pool.py, ...) import each other as
+# top-level modules, the way they run from backend/; make that work here.
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,27 @@
+# Request validation of the FastAPI routes in main.py.
+
+import pytest
+from fastapi.testclient import TestClient
+
+from constants import SOLVE_TIMEOUT_MAX_MS
+from main import app
+
+SOLVED = "UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.parametrize("timeout_ms", [0, -1, SOLVE_TIMEOUT_MAX_MS + 1, "soon"])
+def test_bad_timeout_is_rejected(client, timeout_ms):
+    response = client.post("/solve", json={"cube": SOLVED, "timeout_ms": timeout_ms})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("timeout_ms", [None, SOLVE_TIMEOUT_MAX_MS])
+def test_good_timeout_is_accepted(client, timeout_ms):
+    response = client.post("/solve", json={"cube": SOLVED, "timeout_ms": timeout_ms})
+    assert response.status_code == 200
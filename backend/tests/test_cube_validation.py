@@ -0,0 +1,140 @@
+# Pins the validators to kociemba: validate_cube, validate_many and
+# kociemba.solve must agree on which states are solvable, and the two
+# validators on why the others are not.
+
+import random
+import re
+
+import kociemba
+import numpy as np
+import pytest
+
+from backend.cube_state import MOVES, CubeState
+from backend.cube_validation import (
+    FAIL_COUNTS,
+    FAIL_CUBIE,
+    FAIL_DUPLICATE,
+    FAIL_FLIP,
+    FAIL_LENGTH,
+    FAIL_PARITY,
+    FAIL_TWIST,
+    OK,
+    corner_facelets,
+    edge_facelets,
+    is_cube_solvable,
+    validate_cube,
+    validate_many,
+)
+
+SOLVED = "UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDLLLLLLLLLBBBBBBBBB"
+CENTERS = {4, 13, 22, 31, 40, 49}
+
+
+def swap(state, pairs):
+    s = list(state)
+    for a, b in pairs:
+        s[a], s[b] = s[b], s[a]
+    return "".join(s)
+
+
+def put(state, positions, colors):
+    s = list(state)
+    for p, c in zip(positions, colors):
+        s[p] = c
+    return "".join(s)
+
+
+def scramble(rng):
+    return str(CubeState.solved().move(" ".join(rng.choice(list(MOVES)) for _ in range(25))))
+
+
+def corrupt(state, rng):
+    """One typical scan error: swapped stickers, a twisted corner, a flipped edge, swapped cubies, or noise."""
+    kind = rng.randrange(5)
+    if kind == 0:
+        a, b = rng.sample([i for i in range(54) if i not in CENTERS], 2)
+        return swap(state, [(a, b)])
+    if kind == 1:
+        a, b, c = rng.choice(corner_facelets)
+        return put(state, (a, b, c), (state[b], state[c], state[a]))
+    if kind == 2:
+        return swap(state, [rng.choice(edge_facelets)])
+    if kind == 3:
+        e1, e2 = rng.sample(edge_facelets, 2)
+        return swap(state, list(zip(e1, e2)))
+    stickers = [state[i] for i in range(54) if i not in CENTERS]
+    rng.shuffle(stickers)
+    return put(state, [i for i in range(54) if i not in CENTERS], stickers)
+
+
+def kociemba_solves(state):
+    """kociemba returns moves that really solve state (for some impossible cubies it returns bogus moves)."""
+    try:
+        moves = kociemba.solve(state)
+    except ValueError:
+        return False
+    return str(CubeState(state).move(moves)) == SOLVED
+
+
+def seeded_states(seed=0, n=150):
+    rng = random.Random(seed)
+    states = []
+    for _ in range(n):
+        state = scramble(rng)
+        states += [state, corrupt(state, rng)]
+    return states
+
+
+def test_validators_agree_with_kociemba():
+    states = seeded_states()
+    batch = validate_many(states)
+    singles = [validate_cube(s) for s in states]
+
+    assert [r.code for r in singles] == batch.code.tolist()
+    assert [r.ok for r in singles] == batch.ok.tolist()
+    assert [kociemba_solves(s) for s in states] == batch.ok.tolist()
+    # Both outcomes are actually exercised.
+    assert 0 < batch.ok.sum() < len(states)
+
+
+def _duplicate_corner():
+    # UFL slot shows the URF corner; an R edge sticker becomes L to keep the counts.
+    state = put(SOLVED, corner_facelets[1], "URF")
+    return put(state, [edge_facelets[0][1]], "L")
+
+
+FAIL_CASES = {
+    FAIL_LENGTH: SOLVED[:53],
+    FAIL_COUNTS: "U" * 54,
+    FAIL_CUBIE: swap(SOLVED, [(0, 9)]),  # R sticker on the ULB corner
+    FAIL_DUPLICATE: _duplicate_corner(),
+    FAIL_TWIST: put(SOLVED, corner_facelets[0], [SOLVED[i] for i in corner_facelets[0][1:] + corner_facelets[0][:1]]),
+    FAIL_FLIP: swap(SOLVED, [edge_facelets[0]]),
+    FAIL_PARITY: swap(SOLVED, list(zip(edge_facelets[0], edge_facelets[1]))),
+}
+
+
+@pytest.mark.parametrize("code", sorted(FAIL_CASES))
+def test_failure_codes(code):
+    state = FAIL_CASES[code]
+    result = validate_cube(state)
+
+    assert result.code == code
+    assert not result.ok
+    assert validate_many([state]).code.tolist() == [code]
+    assert not kociemba_solves(state)
+    with pytest.raises(ValueError, match=re.escape(result.reason) if code != FAIL_LENGTH else None):
+        is_cube_solvable(state)
+
+
+def test_empty_batch():
+    for states in ([], np.empty((0, 54), dtype=np.uint8)):
+        result = validate_many(states)
+        assert result.ok.shape == result.code.shape == result.bad_cubies.shape == (0,)
+        assert result.ok.dtype == bool and result.code.dtype == np.uint8
+
+
+def test_solved():
+    assert validate_cube(SOLVED).code == OK
+    assert validate_many([SOLVED]).ok.tolist() == [True]
+    assert is_cube_solvable(SOLVED)
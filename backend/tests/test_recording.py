@@ -0,0 +1,36 @@
+# FrameRecorder / ReplaySource round trip, including a recording that was
+# never closed.
+
+import numpy as np
+
+from backend.recording import FrameRecorder, ReplaySource, is_recording
+
+SHAPE = (4, 6, 3)
+
+
+def frames(n):
+    return [np.full(SHAPE, i, dtype=np.uint8) for i in range(n)]
+
+
+def test_round_trip(tmp_path):
+    recorder = FrameRecorder(str(tmp_path / "session"), SHAPE, capacity=8)
+    for i, frame in enumerate(frames(5)):
+        assert recorder.write(frame, timestamp=i * 0.5)
+    assert not recorder.write(np.zeros((2, 2, 3), dtype=np.uint8))
+    recorder.close()
+
+    replay = ReplaySource(recorder.path)
+    assert [int(f[0, 0, 0]) for f in replay] == [0, 1, 2, 3, 4]
+    assert replay.timestamps.tolist() == [0.0, 0.5, 1.0, 1.5, 2.0]
+    assert recorder.dropped == 1
+
+
+def test_unclosed_recording_replays_to_last_flush(tmp_path):
+    recorder = FrameRecorder(str(tmp_path / "session.npy"), SHAPE, capacity=16, flush_every=4)
+    assert is_recording(recorder.path)
+    for frame in frames(10):
+        recorder.write(frame)
+
+    # No close(), as after a crash: frames up to the last flush survive.
+    replay = ReplaySource(recorder.path)
+    assert [int(f[0, 0, 0]) for f in replay] == list(range(8))
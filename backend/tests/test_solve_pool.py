@@ -0,0 +1,103 @@
+# Single-flight coalescing, cancellation, backpressure and restart of
+# SolvePool. Most tests swap in a one-thread executor whose only worker
+# is held by a blocker task, so solves stay queued until release().
+
+import os
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from backend.cube_state import CubeState
+from solve_pool import SolvePool, SolvePoolBroken, SolvePoolFull
+
+A = str(CubeState.solved().move("R U F' L2 D B'"))
+B = str(CubeState.solved().move("F2 R' U D L"))
+C = str(CubeState.solved().move("B L' D2 R U'"))
+
+
+@pytest.fixture
+def pool():
+    pool = SolvePool(max_workers=1, max_pending=2)
+    pool._executor = ThreadPoolExecutor(max_workers=1)
+    gate = threading.Event()
+    pool._executor.submit(gate.wait)
+    pool.release = gate.set
+    yield pool
+    gate.set()
+    pool.shutdown()
+
+
+def test_singles_coalesce(pool):
+    first = pool.submit(A)
+    assert pool.submit(A) is first
+    assert pool.coalesced == 1
+
+    pool.release()
+    moves, error = first.result(timeout=30)
+    assert error is None and moves
+    assert pool.queue_depth == 0
+
+
+def test_batch_coalesces_onto_single_and_itself(pool):
+    single = pool.submit(A)
+    futures = pool.submit_many([A, B, A])
+    assert futures[0] is single and futures[2] is single
+    assert pool.coalesced == 2
+
+    pool.release()
+    outcomes = [f.result(timeout=30) for f in futures]
+    assert all(error is None for _, error in outcomes)
+    assert pool.queue_depth == 0
+
+
+def test_abandon_cancels_only_for_last_waiter(pool):
+    future = pool.submit(A)
+    pool.submit(A)
+
+    pool.abandon(A, future)
+    assert not future.cancelled()
+    pool.abandon(A, future)
+    assert future.cancelled()
+    assert pool.queue_depth == 0
+
+
+def test_batch_never_joins_an_abandoned_future(pool):
+    future = pool.submit(A)
+    pool.abandon(A, future)
+
+    batch = pool.submit_many([A])
+    assert batch[0] is not future
+    pool.release()
+    assert batch[0].result(timeout=30)[1] is None
+
+
+def test_pool_full_counts_single_solves_only(pool):
+    pool.submit_many([A, B, C])  # batches are exempt
+    pool.submit(str(CubeState.solved().move("U")))
+    pool.submit(str(CubeState.solved().move("D")))
+    with pytest.raises(SolvePoolFull):
+        pool.submit(str(CubeState.solved().move("L")))
+    # Coalescing onto an in-flight solve needs no new slot.
+    pool.submit(A)
+
+
+def test_restart_after_workers_die():
+    pool = SolvePool(max_workers=1)
+    try:
+        executor = pool.start()
+        for process in list(executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+
+        try:
+            pool.submit(A).result(timeout=30)
+        except (SolvePoolBroken, BrokenProcessPool):
+            pass
+
+        moves, error = pool.submit(A).result(timeout=60)
+        assert error is None and moves
+        assert pool._executor is not executor
+    finally:
+        pool.shutdown()
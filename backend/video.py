@@ -5,15 +5,29 @@ import cv2
 from backend import color_processing 
 from backend.config import config
 from backend.helpers import get_next_locale
-from backend.color_processing import color_detector
+from backend.color_processing import color_detector, StickerVotes
+from backend.contours import (
+    REFERENCE_WIDTH,
+    EdgePyramid,
+    square_boxes,
+    find_sticker_cluster,
+    tracking_window,
+    scale_boxes,
+)
 import i18n
-from PIL import ImageFont, ImageDraw, Image
+from PIL import ImageFont
+from backend.overlay import TextOverlay, TilePanel, grid_tiles
+from backend.pipeline import FramePipeline
+from backend.profiler import FrameProfiler
+from backend.camera import CameraRegistry
+from backend.frame_source import CameraSource
+from backend.recording import FrameRecorder
 import numpy as np
+import time
 from backend.constants import (
     COLOR_PLACEHOLDER,
     LOCALES,
     ROOT_DIR,
-    CUBE_PALETTE,
     MINI_STICKER_AREA_TILE_SIZE,
     MINI_STICKER_AREA_TILE_GAP,
     MINI_STICKER_AREA_OFFSET,
@@ -23,9 +37,29 @@ from backend.constants import (
     STICKER_CONTOUR_COLOR,
     CALIBRATE_MODE_KEY,
     SWITCH_LANGUAGE_KEY,
+    PROFILER_KEY,
     TEXT_SIZE,
     E_INCORRECTLY_SCANNED,
-    E_ALREADY_SOLVED
+    E_ALREADY_SOLVED,
+    ROI_TRACKING_ENABLED,
+    ROI_TRACKING_MARGIN,
+    DETECTION_WIDTH,
+    PIPELINE_ENABLED,
+    PROFILER_ENABLED,
+    PROFILER_OUTPUT,
+    PROFILER_WINDOW,
+    PROFILER_HUD,
+    CAMERA_PROFILE_FILE,
+    CAMERA_PROBE_INDICES,
+    CAMERA_PROBE_PARALLEL,
+    CAMERA_WIDTH,
+    CAMERA_HEIGHT,
+    RECORD_MAX_FRAMES,
+    SNAPSHOT_MIN_VOTES,
+    SNAPSHOT_MIN_STABILITY,
+    SNAPSHOT_MIN_CONFIDENCE,
+    SNAPSHOT_MAX_UNSTABLE,
+    AUTO_SNAPSHOT_MIN_VOTES
 )
 # ============================================================
 # ✅ FACE ORIENTATION NORMALIZATION (ROTATIONS ONLY)
@@ -35,29 +69,87 @@ from backend.constants import (
 # (based on what you observed on centers)
 # ============================================================
 
+# Position of each face in the 2D cube net (in face units).
+CUBE_NET_GRID = {
+    'U': (1, 0),
+    'L': (0, 1),
+    'F': (1, 1),
+    'R': (2, 1),
+    'B': (3, 1),
+    'D': (1, 2),
+}
+CUBE_NET_SIDE_OFFSET = MINI_STICKER_AREA_TILE_GAP * 3
+CUBE_NET_SIDE_SIZE = MINI_STICKER_AREA_TILE_SIZE * 3 + MINI_STICKER_AREA_TILE_GAP * 2
+
+# Tile geometry of the sticker panels, relative to each panel's origin.
+STICKER_PANEL_TILES = grid_tiles(STICKER_AREA_TILE_SIZE, STICKER_AREA_TILE_GAP)
+CUBE_NET_TILES = [
+    tile
+    for (grid_x, grid_y) in CUBE_NET_GRID.values()
+    for tile in grid_tiles(
+        MINI_STICKER_AREA_TILE_SIZE, MINI_STICKER_AREA_TILE_GAP,
+        x=(CUBE_NET_SIDE_SIZE + CUBE_NET_SIDE_OFFSET) * grid_x,
+        y=(CUBE_NET_SIDE_SIZE + CUBE_NET_SIDE_OFFSET) * grid_y,
+    )
+]
+
+
+WINDOW_NAME = "Qbr - Rubik's cube solver"
+NO_KEY = 0xff
+
+# Center color names of a calibrated palette -> face letters
+COLOR_TO_FACE = {
+    'white':  'U',
+    'yellow': 'D',
+    'green':  'F',
+    'blue':   'B',
+    'red':    'R',
+    'orange': 'L'
+}
+
+# Profiler stages of one frame, in loop order (see FrameProfiler.lap calls).
+FRAME_STAGES = (
+    'read', 'wait_key', 'input', 'resize', 'cvtColor', 'blur', 'Canny', 'dilate',
+    'find_contours', 'update_preview_state', 'draw', 'imshow',
+)
+# The HUD text is refreshed every this many profiled frames.
+PROFILER_HUD_REFRESH = 15
+
+
 class Webcam:
 
     def __init__(self):
-        print('Starting webcam... (this might take a while, please be patient)')
-        # Force internal MacBook camera
+        # The camera is opened by the first run() (see open_camera), so
+        # importing this module never touches a device.
         self.cam = None
+        self.camera_registry = CameraRegistry(
+            CAMERA_PROFILE_FILE, CAMERA_PROBE_INDICES, CAMERA_WIDTH, CAMERA_HEIGHT,
+            parallel=CAMERA_PROBE_PARALLEL,
+        )
+        self.camera_profile = None
+        self.width = None
+        self.height = None
         self.finished = False
-        for i in range(5):  # try camera indices 0..4
-            cam = cv2.VideoCapture(i)
-            if cam.isOpened():
-                ret, frame = cam.read()
-                if ret and frame is not None:
-                    self.cam = cam
-                    print(f"Using camera index {i}")
-                    break
-                cam.release()
+        self.pipeline_stats = None  # set by run(pipelined=True)
 
-        if self.cam is None:
-            raise RuntimeError("No valid camera found")
-        print('Webcam successfully started')
+        # Raw frames are recorded here while record_path is set (see record_to).
+        self.record_path = None
+        self.record_capacity = RECORD_MAX_FRAMES
+        self.recorder = None
+
+        # Startup milestones (perf_counter seconds / ms), see open_camera()
+        # and process_frame(); on_first_frame() is called once the first
+        # frame has been processed.
+        self.startup_timings = {}
+        self.first_frame_at = None
+        self.on_first_frame = None
 
         self.colors_to_calibrate = ['green', 'red', 'blue', 'orange', 'white', 'yellow']
-        self.average_sticker_colors = {}
+        self.sticker_votes = StickerVotes(stickers=9, rounds=14)
+
+        # UI text: cached sprites and translations.
+        self.text_overlay = TextOverlay(self.get_font)
+        self._translations = {}
         self.result_state = {}
         
 
@@ -69,120 +161,168 @@ class Webcam:
                                (255,255,255), (255,255,255), (255,255,255),
                                (255,255,255), (255,255,255), (255,255,255)]
 
-        self.cam.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cam.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.width = int(self.cam.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.height = int(self.cam.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        # Sticker panels: cached images, repainted only when their state changes.
+        self.preview_panel = TilePanel(STICKER_PANEL_TILES)
+        self.snapshot_panel = TilePanel(STICKER_PANEL_TILES)
+        self.cube_net_panel = TilePanel(CUBE_NET_TILES)
+        self.cube_net_origin = None  # depends on the frame size, see open_camera()
 
         self.calibrate_mode = False
         self.calibrated_colors = {}
         self.current_color_to_calibrate_index = 0
         self.done_calibrating = False
 
-    def draw_stickers(self, stickers, offset_x, offset_y):
-        """Draws the given stickers onto the given frame."""
-        index = -1
-        for row in range(3):
-            for col in range(3):
-                index += 1
-                x1 = (offset_x + STICKER_AREA_TILE_SIZE * col) + STICKER_AREA_TILE_GAP * col
-                y1 = (offset_y + STICKER_AREA_TILE_SIZE * row) + STICKER_AREA_TILE_GAP * row
-                x2 = x1 + STICKER_AREA_TILE_SIZE
-                y2 = y1 + STICKER_AREA_TILE_SIZE
-
-                # shadow
-                cv2.rectangle(
-                    self.frame,
-                    (x1, y1),
-                    (x2, y2),
-                    (0, 0, 0),
-                    -1
-                )
-
-                # foreground color
-                cv2.rectangle(
-                    self.frame,
-                    (x1 + 1, y1 + 1),
-                    (x2 - 1, y2 - 1),
-                    color_processing.get_prominent_color(stickers[index]),
-                    -1
-                )
+        # Per-stage frame timings, toggled with PROFILER_KEY.
+        self.profiler = FrameProfiler(
+            FRAME_STAGES, window=PROFILER_WINDOW, output=PROFILER_OUTPUT or None,
+            hud=PROFILER_HUD, enabled=PROFILER_ENABLED,
+        )
+        self.profiler_hud = []
+
+        # Detection runs on a downscaled level with preallocated buffers.
+        self.edge_pyramid = EdgePyramid(DETECTION_WIDTH, self.profiler)
+
+        # Last locked 3x3 grid (frame coordinates), see detect_contours().
+        self.tracked_contours = None
+        self.detection_stats = {'tracked': 0, 'full_frame': 0, 'lost': 0}
+
+    def open_camera(self, rescan=False):
+        """
+        Open the remembered camera, or probe for one (see camera.py).
+        Does nothing if a camera is already open.
+        """
+        if self.cam is not None:
+            return
+
+        print('Starting webcam... (this might take a while, please be patient)')
+        started = time.perf_counter()
+        cam, self.camera_profile = self.camera_registry.open(rescan=rescan)
+        self.use_source(CameraSource(cam, self.camera_profile))
+        self.startup_timings['camera_probe_ms'] = (time.perf_counter() - started) * 1000
+        profile = self.camera_profile
+        print(f"Using camera index {profile.index} ({profile.width}x{profile.height}, "
+              f"{profile.fps:g} fps, {profile.backend})")
+        print('Webcam successfully started')
+
+    def use_source(self, source):
+        """Read frames from source (see frame_source.py) instead of the camera."""
+        self.cam = source
+        self.set_frame_size(source.width, source.height)
+
+    def record_to(self, path, capacity=None):
+        """
+        Record every frame run() processes, before anything is drawn on it,
+        to path (see recording.py). The file is created on the first frame,
+        with room for capacity frames of its shape.
+        """
+        self.record_path = path
+        if capacity is not None:
+            self.record_capacity = capacity
+
+    def record(self, frame):
+        if self.recorder is None:
+            self.recorder = FrameRecorder(self.record_path, frame.shape, self.record_capacity)
+        self.recorder.write(frame)
+
+    def stop_recording(self):
+        if self.recorder is None:
+            return
+        self.recorder.close()
+        print(f"Recorded {self.recorder.count} frames to {self.recorder.path}"
+              + (f" ({self.recorder.dropped} not recorded: recording full or frame size changed)"
+                 if self.recorder.dropped else ""))
+        self.recorder = None
+
+    def set_frame_size(self, width, height):
+        """Frame size the UI layout is computed for."""
+        self.width = width
+        self.height = height
+        self.cube_net_origin = (
+            self.width - (CUBE_NET_SIDE_SIZE * 4) - (CUBE_NET_SIDE_OFFSET * 3) - MINI_STICKER_AREA_OFFSET,
+            self.height - (CUBE_NET_SIDE_SIZE * 3) - (CUBE_NET_SIDE_OFFSET * 2) - MINI_STICKER_AREA_OFFSET,
+        )
+
+    def draw_stickers(self, panel, stickers, offset_x, offset_y):
+        """Draws the given stickers onto the given frame (panel repainted only if they changed)."""
+        panel.update(
+            tuple(stickers),
+            lambda: [color_processing.get_prominent_color(sticker) for sticker in stickers],
+        )
+        panel.blit(self.frame, offset_x, offset_y)
 
     def draw_preview_stickers(self):
         """Draw the current preview state onto the given frame."""
-        self.draw_stickers(self.preview_state, STICKER_AREA_OFFSET, STICKER_AREA_OFFSET)
+        self.draw_stickers(self.preview_panel, self.preview_state, STICKER_AREA_OFFSET, STICKER_AREA_OFFSET)
 
     def draw_snapshot_stickers(self):
         """Draw the current snapshot state onto the given frame."""
         y = STICKER_AREA_TILE_SIZE * 3 + STICKER_AREA_TILE_GAP * 2 + STICKER_AREA_OFFSET * 2
-        self.draw_stickers(self.snapshot_state, STICKER_AREA_OFFSET, y)
+        self.draw_stickers(self.snapshot_panel, self.snapshot_state, STICKER_AREA_OFFSET, y)
+
+    def detect_in(self, image, scale, size_scale):
+        """
+        Run sticker detection on image (the frame or a window of it) at the
+        pyramid level given by scale. Boxes are returned in image coordinates.
+        """
+        dilatedFrame = self.edge_pyramid.edges(image, scale, size_scale)
+        contours = self.find_contours(dilatedFrame, size_scale)
+        self.profiler.lap('find_contours')
+        return scale_boxes(contours, scale)
+
+    def detect_contours(self):
+        """
+        Find the 9 sticker contours in the current frame.
+
+        Detection runs on a copy downscaled to DETECTION_WIDTH, with the
+        sticker size limits scaled to that level, and the grid is mapped back
+        to full resolution for color sampling.
+
+        While a grid is locked, only a window around it is preprocessed and
+        searched. If the grid isn't found there (cube moved or removed),
+        the whole frame is searched again in the same iteration.
+        """
+        height, width = self.frame.shape[:2]
+        scale = self.edge_pyramid.scale_for(width)
+        size_scale = width * scale / REFERENCE_WIDTH
+
+        if ROI_TRACKING_ENABLED and self.tracked_contours:
+            x0, y0, x1, y1 = tracking_window(
+                self.tracked_contours, ROI_TRACKING_MARGIN, width, height, align=int(round(1 / scale))
+            )
+            contours = self.detect_in(self.frame[y0:y1, x0:x1], scale, size_scale)
+            if len(contours) == 9:
+                self.detection_stats['tracked'] += 1
+                self.tracked_contours = scale_boxes(contours, 1.0, x0, y0)
+                return self.tracked_contours
+            self.detection_stats['lost'] += 1
 
-    def find_contours(self, dilatedFrame):
-        """Find the contours of a 3x3x3 cube."""
+        self.detection_stats['full_frame'] += 1
+        contours = self.detect_in(self.frame, scale, size_scale)
+        self.tracked_contours = contours if len(contours) == 9 else None
+        return contours
+
+    def find_contours(self, dilatedFrame, size_scale=1.0):
+        """
+        Find the contours of a 3x3x3 cube.
+        size_scale scales the sticker size limits (1.0 = 640px wide image).
+        """
         contours, hierarchy = cv2.findContours(
             dilatedFrame, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE
         )
-        final_contours = []
 
         # ------------------------------------------------------------
         # Step 1/4: filter square-ish contours
         # ------------------------------------------------------------
-        for contour in contours:
-            perimeter = cv2.arcLength(contour, True)
-            approx = cv2.approxPolyDP(contour, 0.1 * perimeter, True)
-            if len(approx) == 4:
-                area = cv2.contourArea(contour)
-                (x, y, w, h) = cv2.boundingRect(approx)
-                ratio = w / float(h)
-
-                if (
-                    0.8 <= ratio <= 1.2
-                    and 30 <= w <= 60
-                    and area / (w * h) > 0.4
-                ):
-                    final_contours.append((x, y, w, h))
-
-        if len(final_contours) < 9:
+        boxes = square_boxes(contours, size_scale)
+        if len(boxes) < 9:
             return []
 
         # ------------------------------------------------------------
         # Step 2/4: find contour cluster with 9 neighbors
+        # (grid-indexed, see contours.py)
         # ------------------------------------------------------------
-        contour_neighbors = {}
-        for index, (x, y, w, h) in enumerate(final_contours):
-            contour_neighbors[index] = []
-            cx = x + w / 2
-            cy = y + h / 2
-            radius = 1.5
-
-            neighbor_positions = [
-                (cx - w * radius, cy - h * radius),
-                (cx,              cy - h * radius),
-                (cx + w * radius, cy - h * radius),
-                (cx - w * radius, cy),
-                (cx,              cy),
-                (cx + w * radius, cy),
-                (cx - w * radius, cy + h * radius),
-                (cx,              cy + h * radius),
-                (cx + w * radius, cy + h * radius),
-            ]
-
-            for (x2, y2, w2, h2) in final_contours:
-                for (px, py) in neighbor_positions:
-                    if (
-                        x2 < px < x2 + w2 and
-                        y2 < py < y2 + h2
-                    ):
-                        contour_neighbors[index].append((x2, y2, w2, h2))
-
-        found = False
-        for neighbors in contour_neighbors.values():
-            if len(neighbors) == 9:
-                final_contours = neighbors
-                found = True
-                break
-
-        if not found:
+        final_contours = find_sticker_cluster(boxes)
+        if not final_contours:
             return []
 
         # ------------------------------------------------------------
@@ -228,46 +368,26 @@ class Webcam:
                 cv2.rectangle(self.frame, (x, y), (x + w, y + h), STICKER_CONTOUR_COLOR, 2)
 
     def update_preview_state(self, contours):
-        max_average_rounds = 14
-
-        for index, (x, y, w, h) in enumerate(contours):
-
-            # 🔒 Tight ROI (CRITICAL)
+        # 🔒 Tight ROIs (CRITICAL): inner 40% of each sticker, (x0, y0, x1, y1)
+        rects = []
+        for (x, y, w, h) in contours:
             pad_y = int(h * 0.30)
             pad_x = int(w * 0.30)
-
-            roi = self.frame[
-                y + pad_y : y + h - pad_y,
-                x + pad_x : x + w - pad_x
-            ]
-
-            if roi.size == 0:
-                continue
-
-            roi_blur = cv2.GaussianBlur(roi, (5, 5), 0)
-            avg_bgr = color_detector.get_dominant_color(roi_blur)
-            closest = color_detector.get_closest_color(avg_bgr)
-           
-
-            # ❌ Reject uncertain colors
-            if closest['color_name'] is None:
-                continue
-
-            if index not in self.average_sticker_colors:
-                self.average_sticker_colors[index] = []
-
-            self.average_sticker_colors[index].append(closest['bgr'])
-            if len(self.average_sticker_colors[index]) > max_average_rounds:
-                self.average_sticker_colors[index].pop(0)
-
-            votes = {}
-            for bgr in self.average_sticker_colors[index]:
-                k = str(bgr)
-                votes[k] = votes.get(k, 0) + 1
-
-            most_common_color = max(votes, key=votes.get)
-            self.preview_state[index] = eval(most_common_color)
-
+            rects.append((x + pad_x, y + pad_y, x + w - pad_x, y + h - pad_y))
+        rects = np.array(rects)
+        valid = (rects[:, 2] > rects[:, 0]) & (rects[:, 3] > rects[:, 1])
+
+        # All nine ROI means from one integral image, as a (9, 3) array.
+        # (The box mean needs no pre-blur: blurring only redistributes
+        # pixels inside the ROI.)
+        avg_colors = color_detector.get_dominant_colors(self.frame, rects)
+        palette_index, _, confidence = color_detector.classify(avg_colors)
+
+        # Vote over the last frames (ring buffer of palette indices).
+        votes = self.sticker_votes
+        votes.push(palette_index, confidence, valid)
+        for index in np.flatnonzero(valid):
+            self.preview_state[index] = color_detector.palette_colors[votes.winner[index]]
 
     def update_snapshot_state(self):
         detected_color = color_detector.get_closest_color(
@@ -279,37 +399,24 @@ class Webcam:
             return
 
         # ❌ Reject duplicate face
-        if detected_color in self.result_state:
+        if COLOR_TO_FACE.get(detected_color, detected_color) in self.result_state:
             print(f"❌ Face '{detected_color}' already scanned")
             return
 
-        # 🔒 Require ALL 9 stickers to be reasonably stable
-        unstable = 0
-        for i in range(9):
-            hist = self.average_sticker_colors.get(i, [])
-            if len(hist) < 4:
-                unstable += 1
-                continue
-
-            votes = {}
-            for c in hist:
-                k = str(c)
-                votes[k] = votes.get(k, 0) + 1
-
-            if max(votes.values()) < 3:
-                unstable += 1
-
-        # allow ONE unstable sticker (corner glare, reflection)
-        if unstable > 1:
+        # 🔒 Require the stickers to be stable (see stable_stickers),
+        # allowing SNAPSHOT_MAX_UNSTABLE of them (corner glare, reflection)
+        unstable = int((~self.stable_stickers(SNAPSHOT_MIN_VOTES)).sum())
+        if unstable > SNAPSHOT_MAX_UNSTABLE:
             print(f"❌ Too many unstable stickers ({unstable})")
             return
 
-        # ✅ Store RAW face exactly as seen
+        # ✅ Store RAW face exactly as seen, keyed by face letter
+        # (calibrated palettes name colors, the built-in one faces)
         self.snapshot_state = list(self.preview_state)
-        self.result_state[detected_color] = list(self.preview_state)
+        self.result_state[COLOR_TO_FACE.get(detected_color, detected_color)] = list(self.preview_state)
 
         # reset averaging for next face
-        self.average_sticker_colors = {}
+        self.sticker_votes.reset()
 
         print(f"✅ Stored face: {detected_color}")
 
@@ -317,33 +424,55 @@ class Webcam:
             print("🎉 All faces scanned")
             self.finished = True
 
+    def stable_stickers(self, min_votes):
+        """
+        Per-sticker mask: at least min_votes votes, SNAPSHOT_MIN_STABILITY of
+        them agreeing, with mean confidence SNAPSHOT_MIN_CONFIDENCE.
+        """
+        votes = self.sticker_votes
+        return ((votes.filled >= min_votes)
+                & (votes.stability >= SNAPSHOT_MIN_STABILITY)
+                & (votes.confidence >= SNAPSHOT_MIN_CONFIDENCE))
+
+    def auto_snapshot(self):
+        """
+        Headless stand-in for the space key: snapshot the preview once all
+        stickers are stable with AUTO_SNAPSHOT_MIN_VOTES votes and the face
+        (by center color) isn't scanned yet.
+        """
+        if not self.stable_stickers(AUTO_SNAPSHOT_MIN_VOTES).all():
+            return
+        center = color_detector.get_closest_color(self.preview_state[4])['color_name']
+        if center is None or COLOR_TO_FACE.get(center, center) in self.result_state:
+            return
+        self.update_snapshot_state()
+
     def get_font(self, size):
         return ImageFont.load_default()
 
     def render_text(self, text, pos, color=(255, 255, 255), size=TEXT_SIZE, anchor='lt'):
         """
-        Render text with a shadow using the pillow module.
+        Render text with a shadow, blended into the frame in place from a
+        cached sprite (rendered with pillow only the first time).
         """
-        font = self.get_font(size)
-
-        # Convert opencv frame (np.array) to PIL Image array.
-        frame = Image.fromarray(self.frame)
-
-        # Draw the text onto the image.
-        draw = ImageDraw.Draw(frame)
-        draw.text(pos, text, font=font, fill=color, anchor=anchor,
-                  stroke_width=1, stroke_fill=(0, 0, 0))
-
-        # Convert the pillow frame back to a numpy array.
-        self.frame = np.array(frame)
+        self.text_overlay.draw(self.frame, text, pos, color=color, size=size, anchor=anchor)
 
     def get_text_size(self, text, size=TEXT_SIZE):
         """Get text size based on the default freetype2 loaded font."""
-        return self.get_font(size).getsize(text)
+        return self.text_overlay.text_size(text, size)
+
+    def translate(self, key, **kwargs):
+        """i18n.t, cached per locale so UI labels aren't looked up every frame."""
+        cache_key = (i18n.get('locale'), key, tuple(sorted(kwargs.items())))
+        text = self._translations.get(cache_key)
+        if text is None:
+            text = i18n.t(key, **kwargs)
+            self._translations[cache_key] = text
+        return text
 
     def draw_scanned_sides(self):
         """Display how many sides are scanned by the user."""
-        text = i18n.t('scannedSides', num=len(self.result_state.keys()))
+        text = self.translate('scannedSides', num=len(self.result_state.keys()))
         self.render_text(text, (20, self.height - 20), anchor='lb')
 
     def draw_current_color_to_calibrate(self):
@@ -352,8 +481,8 @@ class Webcam:
         font_size = int(TEXT_SIZE * 1.25)
         if self.done_calibrating:
             messages = [
-                i18n.t('calibratedSuccessfully'),
-                i18n.t('quitCalibrateMode', keyValue=CALIBRATE_MODE_KEY),
+                self.translate('calibratedSuccessfully'),
+                self.translate('quitCalibrateMode', keyValue=CALIBRATE_MODE_KEY),
             ]
             for index, text in enumerate(messages):
                 _, textsize_height = self.get_text_size(text, font_size)
@@ -361,7 +490,7 @@ class Webcam:
                 self.render_text(text, (int(self.width / 2), y), size=font_size, anchor='mt')
         else:
             current_color = self.colors_to_calibrate[self.current_color_to_calibrate_index]
-            text = i18n.t('currentCalibratingSide.{}'.format(current_color))
+            text = self.translate('currentCalibratingSide.{}'.format(current_color))
             self.render_text(text, (int(self.width / 2), offset_y), size=font_size, anchor='mt')
 
     def draw_calibrated_colors(self):
@@ -390,7 +519,7 @@ class Webcam:
                 tuple([int(c) for c in color_bgr]),
                 -1
             )
-            self.render_text(i18n.t(color_name), (20, y1 + STICKER_AREA_TILE_SIZE / 2 - 3), anchor='lm')
+            self.render_text(self.translate(color_name), (20, y1 + STICKER_AREA_TILE_SIZE / 2 - 3), anchor='lm')
 
     def reset_calibrate_mode(self):
         """Reset calibrate mode variables."""
@@ -400,58 +529,43 @@ class Webcam:
 
     def draw_current_language(self):
         text = '{}: {}'.format(
-            i18n.t('language'),
+            self.translate('language'),
             LOCALES[config.get_setting('locale')]
         )
         offset = 20
         self.render_text(text, (self.width - offset, offset), anchor='rt')
 
+    def draw_profiler_hud(self):
+        """Draw fps and the slowest stages in the top right corner, below the language."""
+        if self.profiler.frames % PROFILER_HUD_REFRESH == 0 or not self.profiler_hud:
+            self.profiler_hud = self.profiler.hud_lines()
+        size = TEXT_SIZE - 4
+        offset = 20
+        y = offset + TEXT_SIZE + 10
+        for line in self.profiler_hud:
+            self.render_text(line, (self.width - offset, y), size=size, anchor='rt')
+            y += size + 4
+
     def draw_2d_cube_state(self):
-        # 🔧 Renderer global orientation fix (x2 rotation)
-        
         """
         Create a 2D cube state visualization and draw the self.result_state.
         """
-        grid = {
-            'U': [1, 0],
-            'L': [0, 1],
-            'F': [1, 1],
-            'R': [2, 1],
-            'B': [3, 1],
-            'D': [1, 2],
-        }
-
-        side_offset = MINI_STICKER_AREA_TILE_GAP * 3
-        side_size = MINI_STICKER_AREA_TILE_SIZE * 3 + MINI_STICKER_AREA_TILE_GAP * 2
-        offset_x = self.width - (side_size * 4) - (side_offset * 3) - MINI_STICKER_AREA_OFFSET
-        offset_y = self.height - (side_size * 3) - (side_offset * 2) - MINI_STICKER_AREA_OFFSET
-
-        for side, (grid_x, grid_y) in grid.items():
-            mapped_side = side
-            index = -1
-            for row in range(3):
-                for col in range(3):
-                    index += 1
-                    x1 = int(
-                        (offset_x + MINI_STICKER_AREA_TILE_SIZE * col) +
-                        (MINI_STICKER_AREA_TILE_GAP * col) +
-                        ((side_size + side_offset) * grid_x)
-                    )
-                    y1 = int(
-                        (offset_y + MINI_STICKER_AREA_TILE_SIZE * row) +
-                        (MINI_STICKER_AREA_TILE_GAP * row) +
-                        ((side_size + side_offset) * grid_y)
-                    )
-                    x2 = int(x1 + MINI_STICKER_AREA_TILE_SIZE)
-                    y2 = int(y1 + MINI_STICKER_AREA_TILE_SIZE)
-
-                    foreground_color = COLOR_PLACEHOLDER
-                    if mapped_side in self.result_state:
-                        foreground_color = color_processing.get_prominent_color(
-                            self.result_state[mapped_side][index]
-                        )
-                    cv2.rectangle(self.frame, (x1, y1), (x2, y2), (0, 0, 0), -1)
-                    cv2.rectangle(self.frame, (x1 + 1, y1 + 1), (x2 - 1, y2 - 1), foreground_color, -1)
+        def colors():
+            out = []
+            for side in CUBE_NET_GRID:
+                for index in range(9):
+                    if side in self.result_state:
+                        out.append(color_processing.get_prominent_color(self.result_state[side][index]))
+                    else:
+                        out.append(COLOR_PLACEHOLDER)
+            return out
+
+        key = tuple(
+            tuple(self.result_state[side]) if side in self.result_state else None
+            for side in CUBE_NET_GRID
+        )
+        self.cube_net_panel.update(key, colors)
+        self.cube_net_panel.blit(self.frame, *self.cube_net_origin)
 
     def get_result_notation(self):
         """
@@ -461,26 +575,20 @@ class Webcam:
 
         FACE_ORDER = ['U', 'R', 'F', 'D', 'L', 'B']
 
-        # Map center colors → face letters
-        COLOR_TO_FACE = {
-            'white':  'U',
-            'yellow': 'D',
-            'green':  'F',
-            'blue':   'B',
-            'red':    'R',
-            'orange': 'L'
-        }
-
-        cube_string = ""
-
-        for face in FACE_ORDER:
-            stickers = self.result_state[face]
-
-            for bgr in stickers:
-                color_name = color_detector.get_closest_color(bgr)['color_name']
-                cube_string += color_name
-
-        return cube_string
+        # Stored stickers are palette colors (update_preview_state), so map
+        # them back exactly: the quantized lookup could merge two calibrated
+        # colors closer than one LUT cell. Anything else (a sticker never
+        # detected) is classified, all 54 in one lookup. Calibrated palettes
+        # are keyed by color name, the built-in one by face letter.
+        exact = {}
+        for i, bgr in enumerate(color_detector.palette_colors):
+            exact.setdefault(tuple(bgr), i)
+        stickers = [bgr for face in FACE_ORDER for bgr in self.result_state[face]]
+        palette_index, _, _ = color_detector.classify(np.array(stickers))
+        letters = [COLOR_TO_FACE.get(name, name) for name in color_detector.palette_names]
+        return "".join(
+            letters[exact.get(tuple(bgr), i)] for bgr, i in zip(stickers, palette_index)
+        )
 
     def state_already_solved(self):
         for side in self.result_state.keys():
@@ -490,69 +598,159 @@ class Webcam:
                     return False
         return True
 
-    def run(self):
+    def process_frame(self, frame, key, draw=True):
         """
-        Open up the webcam and present the user with the Qbr user interface.
-        Returns a string of the scanned state in rubik's cube notation.
+        One iteration of the UI for a captured frame and the key pressed
+        (0xff for none): handle the key, detect stickers, update state and
+        draw the overlays (unless draw is False). Returns the frame.
         """
-        while not self.finished:
-            _, frame = self.cam.read()
-            self.frame = frame
-            key = cv2.waitKey(10) & 0xff
+        if self.record_path is not None:
+            self.record(frame)
+        if draw and not frame.flags.writeable:
+            # Replayed recordings are read-only views of a memory map.
+            frame = frame.copy()
+        self.frame = frame
+
+        if not self.calibrate_mode:
+            if key == 32:
+                self.update_snapshot_state()
+
+            if key == SWITCH_LANGUAGE_KEY:
+                next_locale = get_next_locale(config.get_setting('locale'))
+                config.set_setting('locale', next_locale)
+                i18n.set('locale', next_locale)
+
+        if key == CALIBRATE_MODE_KEY:
+            self.reset_calibrate_mode()
+            self.calibrate_mode = not self.calibrate_mode
+
+        if key == PROFILER_KEY:
+            self.profiler.toggle()
+        self.profiler.lap('input')
+
+        contours = self.detect_contours()
+        if len(contours) == 9:
+            if draw:
+                self.draw_contours(contours)
+            if not self.calibrate_mode:
+                self.update_preview_state(contours)
+            elif key == 32 and self.done_calibrating is False:
+                current_color = self.colors_to_calibrate[self.current_color_to_calibrate_index]
+                (x, y, w, h) = contours[4]
+                roi = self.frame[y+7:y+h-7, x+14:x+w-14]
+                avg_bgr = color_detector.get_dominant_color(roi)
+                self.calibrated_colors[current_color] = avg_bgr
+                self.current_color_to_calibrate_index += 1
+                self.done_calibrating = self.current_color_to_calibrate_index == len(self.colors_to_calibrate)
+                if self.done_calibrating:
+                    # Persisted in the active palette profile; color_detector
+                    # picks it up through config.watch_palette.
+                    config.save_palette(self.calibrated_colors)
+                    # Votes are palette indices; they refer to the old palette.
+                    self.sticker_votes.reset()
+        self.profiler.lap('update_preview_state')
+
+        if draw:
+            self.draw_overlays()
+            self.profiler.lap('draw')
+
+        if self.first_frame_at is None:
+            self.first_frame_at = time.perf_counter()
+            if self.on_first_frame is not None:
+                self.on_first_frame()
+
+        return self.frame
+
+    def draw_overlays(self):
+        if self.calibrate_mode:
+            self.draw_current_color_to_calibrate()
+            self.draw_calibrated_colors()
+        else:
+            self.draw_current_language()
+            self.draw_preview_stickers()
+            self.draw_snapshot_stickers()
+            self.draw_scanned_sides()
+            self.draw_2d_cube_state()
 
-            if key == 27:
+        if self.profiler.enabled and self.profiler.hud:
+            self.draw_profiler_hud()
+
+    def run_headless(self):
+        """
+        Scan without a window: no drawing, no imshow and no waitKey pacing,
+        so an offline source is consumed as fast as it decodes. Faces are
+        captured by auto_snapshot() instead of the space key.
+        """
+        profiler = self.profiler
+        while not self.finished:
+            profiler.start_frame()
+            ok, frame = self.cam.read()
+            profiler.lap('read')
+            if not ok or frame is None:
                 break
+            self.process_frame(frame, NO_KEY, draw=False)
+            self.auto_snapshot()
+            profiler.end_frame()
 
-            if not self.calibrate_mode:
-                if key == 32:
-                    self.update_snapshot_state()
+    def run(self, pipelined=None, source=None, headless=False):
+        """
+        Open up the webcam and present the user with the Qbr user interface.
+        Returns a string of the scanned state in rubik's cube notation.
 
-                if key == SWITCH_LANGUAGE_KEY:
-                    next_locale = get_next_locale(config.get_setting('locale'))
-                    config.set_setting('locale', next_locale)
-                    i18n.set('locale', next_locale)
+        With pipelined=True (default: PIPELINE_ENABLED), capture, processing
+        and display run on separate threads (see pipeline.py); their
+        counters are kept in self.pipeline_stats.
 
-            if key == CALIBRATE_MODE_KEY:
-                self.reset_calibrate_mode()
-                self.calibrate_mode = not self.calibrate_mode
+        Frames are timed by self.profiler while it is enabled (PROFILER_KEY
+        toggles it). In pipelined mode only the process stage is profiled;
+        read and display latencies are in self.pipeline_stats.
 
-            grayFrame = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
-            blurredFrame = cv2.blur(grayFrame, (3, 3))
-            cannyFrame = cv2.Canny(blurredFrame, 30, 60, 3)
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 9))
-            dilatedFrame = cv2.dilate(cannyFrame, kernel)
+        source (a frame_source.FrameSource) replaces the camera, e.g. a
+        recorded clip; the scan ends when it runs out of frames. Sources
+        that aren't live always run serially, since the pipeline drops
+        frames processing can't keep up with. headless
+        runs without any window (see run_headless). Frames are recorded
+        if record_to() was called.
+        """
+        if source is not None:
+            self.use_source(source)
+        else:
+            self.open_camera()
+        if pipelined is None:
+            pipelined = PIPELINE_ENABLED
+        if pipelined and not self.cam.live:
+            print("Offline source: not pipelined (the pipeline drops frames it can't keep up with)")
+            pipelined = False
+
+        if headless:
+            self.run_headless()
+        elif pipelined:
+            pipeline = FramePipeline(self, WINDOW_NAME)
+            pipeline.run()
+            self.pipeline_stats = pipeline.stats()
+        else:
+            profiler = self.profiler
+            while not self.finished:
+                profiler.start_frame()
+                ok, frame = self.cam.read()
+                profiler.lap('read')
+                if not ok or frame is None:
+                    break
+                key = cv2.waitKey(10) & 0xff
+                profiler.lap('wait_key')
 
-            contours = self.find_contours(dilatedFrame)
-            if len(contours) == 9:
-                self.draw_contours(contours)
-                if not self.calibrate_mode:
-                    self.update_preview_state(contours)
-                elif key == 32 and self.done_calibrating is False:
-                    current_color = self.colors_to_calibrate[self.current_color_to_calibrate_index]
-                    (x, y, w, h) = contours[4]
-                    roi = self.frame[y+7:y+h-7, x+14:x+w-14]
-                    avg_bgr = color_detector.get_dominant_color(roi)
-                    self.calibrated_colors[current_color] = avg_bgr
-                    self.current_color_to_calibrate_index += 1
-                    self.done_calibrating = self.current_color_to_calibrate_index == len(self.colors_to_calibrate)
-                    if self.done_calibrating:
-                        color_detector.set_cube_color_pallete(self.calibrated_colors)
-                        config.set_setting(CUBE_PALETTE, color_detector.cube_color_palette)
-
-            if self.calibrate_mode:
-                self.draw_current_color_to_calibrate()
-                self.draw_calibrated_colors()
-            else:
-                self.draw_current_language()
-                self.draw_preview_stickers()
-                self.draw_snapshot_stickers()
-                self.draw_scanned_sides()
-                self.draw_2d_cube_state()
-
-            cv2.imshow("Qbr - Rubik's cube solver", self.frame)
+                if key == 27:
+                    break
+
+                cv2.imshow(WINDOW_NAME, self.process_frame(frame, key))
+                profiler.lap('imshow')
+                profiler.end_frame()
 
+        self.profiler.close()
+        self.stop_recording()
         self.cam.release()
-        cv2.destroyAllWindows()
+        if not headless:
+            cv2.destroyAllWindows()
 
         if len(self.result_state.keys()) != 6:
             return E_INCORRECTLY_SCANNED